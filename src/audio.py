@@ -1,15 +1,79 @@
+import fcntl
 import os
 import subprocess
 import time
 import wave
 import logging
-from collections import deque
 from pathlib import Path
 from typing import Iterator
 
 import numpy as np
 import webrtcvad
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the numpy prefilter is used without it
+    njit = None
+
+# Kernel pipe buffer for arecord's stdout (Linux default is 64 KiB, ~2 s at 16 kHz);
+# 1 MiB is the unprivileged maximum and holds ~30 s if the capture thread stalls
+PIPE_BUFFER_BYTES = 1 << 20
+
+# Prefilter verdicts per 10 ms subframe
+SILENT, AMBIGUOUS, VOICED = 0, 1, 2
+
+
+def _classify_subframes_numpy(
+    sub: np.ndarray, silence_level: float, speech_level: float, max_zcr: float
+) -> tuple[np.ndarray, float]:
+    """Energy/ZCR verdict for each row of sub, plus the mean power of the whole frame."""
+    wide = sub.astype(np.int32)
+    power = np.mean(wide * wide, axis=1)
+    rms = np.sqrt(power)
+    zcr = np.count_nonzero(np.diff(np.signbit(sub), axis=1), axis=1) / sub.shape[1]
+    verdicts = np.full(len(sub), AMBIGUOUS, dtype=np.int8)
+    verdicts[rms < silence_level] = SILENT
+    verdicts[(rms > speech_level) & (zcr < max_zcr)] = VOICED
+    return verdicts, float(power.mean())
+
+
+def _classify_subframes_loop(
+    sub: np.ndarray, silence_level: float, speech_level: float, max_zcr: float
+) -> tuple[np.ndarray, float]:
+    # Same as the numpy version, written as plain loops for numba to compile
+    rows, n = sub.shape
+    verdicts = np.empty(rows, dtype=np.int8)
+    total_power = 0.0
+    for r in range(rows):
+        energy = 0.0
+        crossings = 0
+        prev_neg = sub[r, 0] < 0
+        for i in range(n):
+            x = float(sub[r, i])
+            energy += x * x
+            neg = sub[r, i] < 0
+            if neg != prev_neg:
+                crossings += 1
+            prev_neg = neg
+        power = energy / n
+        total_power += power
+        rms = np.sqrt(power)
+        if rms < silence_level:
+            verdicts[r] = SILENT
+        elif rms > speech_level and crossings / n < max_zcr:
+            verdicts[r] = VOICED
+        else:
+            verdicts[r] = AMBIGUOUS
+    return verdicts, total_power / rows
+
+
+if njit is not None:
+    _classify_subframes = njit(cache=True, fastmath=True)(_classify_subframes_loop)
+    # Compile now so the first captured frame doesn't pay for it
+    _classify_subframes(np.zeros((3, 160), dtype=np.int16), 0.0, 1.0, 0.3)
+else:
+    _classify_subframes = _classify_subframes_numpy
+
 
 class AudioChunker:
     def __init__(
@@ -29,10 +93,30 @@ class AudioChunker:
         self.vad = webrtcvad.Vad(2)  # 0-3: 3 is most aggressive
         self.frame_ms = 30
         self.frame_bytes = int(sample_rate * (self.frame_ms / 1000.0) * 2)  # 16-bit mono
+        self.read_block_bytes = self.frame_bytes * 16  # up to ~0.5s of audio per read syscall
+        # Cheap energy/ZCR prefilter in front of webrtcvad, run on 10 ms subframes:
+        # clear silence and clear voiced subframes are decided in numpy, only
+        # ambiguous ones go to the VAD (which accepts 10 ms frames)
+        self.subframe_samples = sample_rate // 100
+        self.subframe_bytes = self.subframe_samples * 2
+        self.noise_rms = 100.0  # running estimate of the room's noise floor (int16 RMS)
+        self.noise_alpha = 0.05  # EWMA weight for noise floor updates
+        self.silence_ratio = 2.0  # below noise_rms * ratio -> silence
+        self.speech_ratio = 20.0  # above noise_rms * ratio (and speech_min_rms) -> speech
+        self.speech_min_rms = 2000.0
+        self.speech_max_zcr = 0.3  # voiced speech crosses zero far less often than hiss
         self.enable_wake_word = enable_wake_word
         self.trigger_phrases = trigger_phrases or []
         self.enable_streaming = enable_streaming
         self.streaming_chunk_seconds = 3  # Emit intermediate chunks every 3 seconds during speech
+        
+        # Preallocated int16 ring buffer holding the pre-roll silence plus the active recording.
+        # Positions are absolute sample counts; the slot in the buffer is position % len(buffer).
+        self.frame_samples = self.frame_bytes // 2
+        self.preroll_samples = int((sample_rate * 2 * chunk_seconds) / self.frame_bytes) * self.frame_samples
+        self._max_samples = sample_rate * 300  # safety valve: split recordings longer than 5 minutes
+        self._buf = np.zeros(self.preroll_samples + self._max_samples + self.frame_samples, dtype=np.int16)
+        self._write_idx = 0
 
     def _arecord_cmd(self) -> list[str]:
         cmd = [
@@ -52,14 +136,26 @@ class AudioChunker:
         return cmd
 
     def _frames(self) -> Iterator[bytes]:
-        proc = subprocess.Popen(self._arecord_cmd(), stdout=subprocess.PIPE)
+        proc = subprocess.Popen(self._arecord_cmd(), stdout=subprocess.PIPE, bufsize=0)
         assert proc.stdout is not None
+        fd = proc.stdout.fileno()
+        try:
+            fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, PIPE_BUFFER_BYTES)
+        except (AttributeError, OSError) as e:
+            logging.debug("could not enlarge arecord pipe buffer: %s", e)
+        pending = b""
         try:
             while True:
-                data = proc.stdout.read(self.frame_bytes)
+                # os.read returns whatever is available (up to the block size), so a
+                # block read never waits longer than a single-frame read would
+                data = os.read(fd, self.read_block_bytes)
                 if not data:
                     break
-                yield data
+                pending += data
+                full = len(pending) - len(pending) % self.frame_bytes
+                for i in range(0, full, self.frame_bytes):
+                    yield pending[i : i + self.frame_bytes]
+                pending = pending[full:]
         finally:
             proc.terminate()
             try:
@@ -67,17 +163,72 @@ class AudioChunker:
             except subprocess.TimeoutExpired:
                 proc.kill()
 
+    def _is_speech(self, frame: bytes) -> bool:
+        # One row per 10 ms subframe; all subframes are scored in a single pass
+        sub = np.frombuffer(frame, dtype=np.int16).reshape(-1, self.subframe_samples)
+        verdicts, mean_power = _classify_subframes(
+            sub,
+            self.noise_rms * self.silence_ratio,
+            max(self.noise_rms * self.speech_ratio, self.speech_min_rms),
+            self.speech_max_zcr,
+        )
+        
+        if (verdicts == VOICED).any():
+            return True
+        is_speech = any(
+            self.vad.is_speech(frame[i * self.subframe_bytes : (i + 1) * self.subframe_bytes], self.sample_rate)
+            for i in np.flatnonzero(verdicts == AMBIGUOUS)
+        )
+        
+        # Track the noise floor on non-speech frames only
+        if not is_speech:
+            self.noise_rms += self.noise_alpha * (mean_power ** 0.5 - self.noise_rms)
+        return is_speech
+
+    def _append(self, frame: bytes) -> None:
+        samples = np.frombuffer(frame, dtype=np.int16)
+        n = len(samples)
+        pos = self._write_idx % len(self._buf)
+        end = pos + n
+        if end <= len(self._buf):
+            self._buf[pos:end] = samples
+        else:
+            split = len(self._buf) - pos
+            self._buf[pos:] = samples[:split]
+            self._buf[: n - split] = samples[split:]
+        self._write_idx += n
+
+    def _pcm(self, start: int, end: int) -> bytes:
+        """Copy samples [start, end) out of the ring buffer as PCM16 bytes."""
+        s = start % len(self._buf)
+        e = end % len(self._buf)
+        if s <= e:
+            return self._buf[s:e].tobytes()
+        return self._buf[s:].tobytes() + self._buf[:e].tobytes()
+
+    def _open_wav(self, path: Path) -> wave.Wave_write:
+        wf = wave.open(str(path), "wb")
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(self.sample_rate)
+        return wf
+
     def _write_wav(self, pcm16: bytes, path: Path) -> None:
-        with wave.open(str(path), "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(self.sample_rate)
+        with self._open_wav(path) as wf:
             wf.writeframes(pcm16)
 
+    def _finish_wav(self, wf: wave.Wave_write, part_path: Path, out_path: Path) -> None:
+        wf.close()  # patches the header with the final length
+        part_path.rename(out_path)
+
     def run(self) -> Iterator[Path]:
-        # Dynamic buffer: expands during speech, fixed size during silence
-        active_recording: list[bytes] = []
-        silence_buffer = deque(maxlen=int((self.sample_rate * 2 * self.chunk_seconds) / self.frame_bytes))
+        # Dynamic recording: grows during speech, fixed-size pre-roll of silence while idle.
+        # Both live in the ring buffer; only the start indices are tracked here.
+        speech_start_idx = 0
+        silence_start_idx = 0  # start of the silence run since the last emit
+        # The final recording is written to disk as it's captured, then renamed on emit
+        wav_out: wave.Wave_write | None = None
+        wav_part = self.out_dir / "recording.wav.part"
         
         last_emit = time.time()
         last_speech_time = time.time()
@@ -87,67 +238,66 @@ class AudioChunker:
         is_recording_speech = False
         
         for frame in self._frames():
-            is_speech = self.vad.is_speech(frame, self.sample_rate)
+            is_speech = self._is_speech(frame)
             
             now = time.time()
+            frame_start_idx = self._write_idx
+            self._append(frame)
             
             # Track when speech was last detected
             if is_speech:
                 # Start or continue active recording
                 if not is_recording_speech:
-                    # Speech started - dump silence buffer into active recording
-                    active_recording.extend(list(silence_buffer))
+                    # Speech started - keep the preceding silence as pre-roll context
+                    speech_start_idx = max(silence_start_idx, frame_start_idx - self.preroll_samples)
+                    wav_out = self._open_wav(wav_part)
+                    wav_out.writeframesraw(self._pcm(speech_start_idx, frame_start_idx))
                     is_recording_speech = True
                     last_stream_emit = now
                     logging.debug("speech detected, started active recording")
                 
-                active_recording.append(frame)
                 last_speech_time = now
-                silence_buffer.clear()  # Clear silence buffer during speech
                 
                 # Streaming mode: emit intermediate chunks every 3 seconds while speaking
                 if self.enable_streaming and now - last_stream_emit >= self.streaming_chunk_seconds:
-                    pcm = b"".join(active_recording)
+                    pcm = self._pcm(speech_start_idx, self._write_idx)
                     ts = int(now)
                     out_path = self.out_dir / f"audio_{ts}_stream.wav"
                     self._write_wav(pcm, out_path)
                     yield out_path
                     last_stream_emit = now
                     logging.debug("emitted streaming chunk (still speaking)")
-                    # Keep recording - don't clear active_recording
-            else:
-                # No speech - add to silence buffer
-                silence_buffer.append(frame)
+                    # Keep recording - don't reset speech_start_idx
+            
+            if is_recording_speech:
+                wav_out.writeframesraw(frame)
             
             # Calculate time since last speech
             silence_duration = now - last_speech_time
             
             # Emit when: we have active recording AND 1 second of silence
-            if is_recording_speech and silence_duration >= silence_threshold and len(active_recording) > 0:
-                # Add the silence buffer (trailing context)
-                active_recording.extend(list(silence_buffer))
-                
-                pcm = b"".join(active_recording)
+            if is_recording_speech and silence_duration >= silence_threshold:
+                # Recording runs up to now, so the trailing silence is included as context
                 ts = int(now)
                 out_path = self.out_dir / f"audio_{ts}.wav"
-                self._write_wav(pcm, out_path)
+                self._finish_wav(wav_out, wav_part, out_path)
+                wav_out = None
                 yield out_path
                 
                 # Reset for next recording
-                active_recording.clear()
-                silence_buffer.clear()
+                silence_start_idx = self._write_idx
                 is_recording_speech = False
                 last_emit = now
                 logging.debug("emitted final recording after %.1f sec silence", silence_duration)
             
             # Safety valve: emit if recording gets too long (>5 minutes) even if still talking
-            if is_recording_speech and len(active_recording) > (self.sample_rate * 2 * 300) / self.frame_bytes:
-                pcm = b"".join(active_recording)
+            if is_recording_speech and self._write_idx - speech_start_idx >= self._max_samples:
                 ts = int(now)
                 out_path = self.out_dir / f"audio_{ts}_long.wav"
-                self._write_wav(pcm, out_path)
+                self._finish_wav(wav_out, wav_part, out_path)
+                wav_out = None
                 yield out_path
-                active_recording.clear()
+                silence_start_idx = self._write_idx
                 is_recording_speech = False
                 last_emit = now
                 logging.info("emitted long recording (>5 min), split to avoid memory issues")
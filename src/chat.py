@@ -1,5 +1,48 @@
+from functools import lru_cache
 from typing import List, Dict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+
+# Reused across calls so each chat turn rides a warm keep-alive TLS connection
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            # Retry only failures where the POST never reached the model (connect errors,
+            # gateway/rate-limit statuses); a read error or timeout may already be billed
+            total=2, read=0, backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504], allowed_methods=None,
+        ),
+    ),
+)
+
+
+# OpenRouter model prefixes whose providers take explicit cache_control breakpoints
+_CACHE_CONTROL_PREFIXES = ("anthropic/",)
+
+
+@lru_cache(maxsize=16)
+def _system_message(system_override: str | None, personality: str | None, cache_control: bool) -> Dict:
+    """
+    Build the system message once per (override, personality, cache_control) combination.
+    The personality prompt is fixed for the process lifetime, so it goes first;
+    the per-turn override (memory, vision context) follows it and doesn't disturb
+    the stable prefix. Only providers that accept cache_control get text parts
+    with a breakpoint on the personality; everyone else gets a plain string.
+    """
+    if not cache_control:
+        return {"role": "system", "content": "\n".join(p for p in (personality, system_override) if p)}
+    parts: List[Dict] = []
+    if personality:
+        parts.append({"type": "text", "text": personality, "cache_control": {"type": "ephemeral"}})
+    if system_override:
+        parts.append({"type": "text", "text": system_override})
+    return {"role": "system", "content": parts}
 
 
 def chat_openrouter(api_key: str, model: str, messages: List[Dict[str, str]], system_override: str | None = None, personality: str | None = None) -> str:
@@ -11,19 +54,11 @@ def chat_openrouter(api_key: str, model: str, messages: List[Dict[str, str]], sy
         "HTTP-Referer": "https://local.pi/",
         "X-Title": "Home AI Assistant",
     }
-    # Optionally inject or override system message for safety
-    msgs: List[Dict[str, str]] = []
-    # keep the most recent non-system messages but replace/insert system
-    for m in messages:
-        if m.get("role") != "system":
-            msgs.append(m)
-    system_content_parts: List[str] = []
-    if system_override:
-        system_content_parts.append(system_override)
-    if personality:
-        system_content_parts.append(personality)
-    if system_content_parts:
-        msgs.insert(0, {"role": "system", "content": "\n".join(system_content_parts)})
+    # Optionally inject or override system message for safety:
+    # keep the non-system messages but replace/insert system up front
+    if system_override or personality:
+        msgs = [_system_message(system_override, personality, model.startswith(_CACHE_CONTROL_PREFIXES))]
+        msgs += [m for m in messages if m.get("role") != "system"]
     else:
         msgs = messages
 
@@ -33,7 +68,7 @@ def chat_openrouter(api_key: str, model: str, messages: List[Dict[str, str]], sy
         "temperature": 0.2,
         "max_tokens": 256,
     }
-    resp = requests.post(url, headers=headers, json=payload, timeout=60)
+    resp = _SESSION.post(url, headers=headers, json=payload, timeout=60)
     resp.raise_for_status()
     data = resp.json()
     return data["choices"][0]["message"]["content"].strip()
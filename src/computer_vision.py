@@ -5,90 +5,156 @@ Captures video on motion, analyzes with AI, stores descriptions in memory.
 import subprocess
 import base64
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import time
 
 
-def capture_video(width: int, height: int, duration: int, out_path: Path) -> bool:
+JPEG_DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+VIDEO_FRAMERATE = 15  # capture rate; frame indices for extraction are derived from it
+
+# Reused across motion events so vision calls skip the TLS handshake
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=4,
+        max_retries=Retry(
+            # Retry only failures where the POST never reached the model (connect errors,
+            # gateway/rate-limit statuses); a read error or timeout may already be billed
+            total=2, read=0, backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504], allowed_methods=None,
+        ),
+    ),
+)
+
+
+def _camera_cmd(cmd_base: str, width: int, height: int, duration: int, output: str) -> list[str]:
+    return [
+        cmd_base,
+        "-t", str(duration * 1000),  # milliseconds
+        "--width", str(width),
+        "--height", str(height),
+        "-o", output,
+        "--codec", "h264",
+        "-n",  # no preview
+        "--framerate", str(VIDEO_FRAMERATE),
+    ]
+
+
+def _extract_cmd(source: str, timestamps: list[float], frame_pattern: Path) -> list[str]:
+    """
+    ffmpeg command that pulls the frames at the given timestamps in one decode pass.
+    Frames are selected by index (raw h264 has no container timestamps to seek on).
+    """
+    frame_indices = sorted({int(round(t * VIDEO_FRAMERATE)) for t in timestamps})
+    select_expr = "+".join(f"eq(n\\,{n})" for n in frame_indices)
+    return [
+        "ffmpeg",
+        "-threads", "4",
+        "-f", "h264",
+        "-i", source,
+        "-vf", f"select='{select_expr}'",
+        "-vsync", "vfr",
+        "-q:v", "2",
+        str(frame_pattern),
+        "-y",
+    ]
+
+
+def _frame_timestamps(duration: int, num_frames: int) -> list[float]:
+    """N evenly-spaced timestamps inside a clip of the given (known) duration."""
+    interval = duration / (num_frames + 1)
+    return [interval * i for i in range(1, num_frames + 1)]
+
+
+def _frame_paths(video_path: Path, count: int) -> list[Path]:
+    """Frames written by _extract_cmd that actually exist, in order."""
+    frames = []
+    for i in range(1, count + 1):
+        frame_path = video_path.parent / f"{video_path.stem}_frame{i}.jpg"
+        if frame_path.exists():
+            frames.append(frame_path)
+    return frames
+
+
+def capture_frames(width: int, height: int, duration: int, video_path: Path, num_frames: int = 3) -> list[Path]:
     """
-    Capture video using rpicam-vid (Pi 5) or libcamera-vid (older Pi).
-    Returns True if successful.
+    Capture video and extract N evenly-spaced frames in one pipeline.
+    The camera streams h264 on stdout straight into ffmpeg, so frames are
+    decoded while recording instead of after it and no video file is written.
+    Frames are named after video_path. Returns list of frame paths.
     """
+    timestamps = _frame_timestamps(duration, num_frames)
+    frame_pattern = video_path.parent / f"{video_path.stem}_frame%d.jpg"
+    
     for cmd_base in ["rpicam-vid", "libcamera-vid"]:
-        cmd = [
-            cmd_base,
-            "-t", str(duration * 1000),  # milliseconds
-            "--width", str(width),
-            "--height", str(height),
-            "-o", str(out_path),
-            "--codec", "h264",
-            "-n",  # no preview
-            "--framerate", "15",
-        ]
         try:
-            result = subprocess.run(cmd, capture_output=True, timeout=duration + 5, check=True)
-            return result.returncode == 0
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            camera = subprocess.Popen(
+                _camera_cmd(cmd_base, width, height, duration, "-"),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
             logging.warning(f"Video capture with {cmd_base} failed: {e}. Trying next option.")
             continue
+        
+        try:
+            extractor = subprocess.Popen(
+                _extract_cmd("pipe:0", timestamps, frame_pattern),
+                stdin=camera.stdout,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            camera.kill()
+            camera.wait()  # reap it so it doesn't linger as a zombie
+            logging.error("frame extraction failed: %s", e)
+            return []
+        finally:
+            camera.stdout.close()  # ffmpeg owns the read end now
+        
+        try:
+            camera.wait(timeout=duration + 5)
+            extractor.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            camera.kill()
+            extractor.kill()
+            camera.wait()
+            extractor.wait()
+            logging.error("video capture pipeline timed out")
+            return _frame_paths(video_path, len(timestamps))
+        
+        if camera.returncode != 0:
+            logging.warning(f"Video capture with {cmd_base} failed (exit {camera.returncode}). Trying next option.")
+            continue
+        return _frame_paths(video_path, len(timestamps))
     
     logging.error("Video capture command not found (tried rpicam-vid and libcamera-vid)")
-    return False
+    return []
 
 
-def extract_frames(video_path: Path, num_frames: int = 6) -> list[Path]:
-    """
-    Extract N evenly-spaced frames from video using ffmpeg.
-    Returns list of frame paths.
-    """
-    frames = []
+def _encode_image(img_path: Path) -> Optional[dict]:
+    """Read a JPEG and wrap it as a GPT-4o image_url content part. None on failure."""
     try:
-        # Get video duration
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-        duration_str = result.stdout.strip()
-        
-        # Handle 'N/A' or empty response
-        if not duration_str or duration_str == 'N/A':
-            logging.warning("ffprobe returned invalid duration, using fixed interval extraction")
-            # Fallback: extract frames at fixed intervals (0s, 5s, 9s for 10s video)
-            timestamps = [0, 5, 9]
-        else:
-            duration = float(duration_str)
-            # Extract frames at evenly spaced intervals
-            interval = duration / (num_frames + 1)
-            timestamps = [interval * i for i in range(1, num_frames + 1)]
-        
-        # Extract frames at calculated timestamps
-        for i, timestamp in enumerate(timestamps, 1):
-            frame_path = video_path.parent / f"{video_path.stem}_frame{i}.jpg"
-            
-            cmd = [
-                "ffmpeg",
-                "-ss", str(timestamp),
-                "-i", str(video_path),
-                "-vframes", "1",
-                "-q:v", "2",
-                str(frame_path),
-                "-y",
-            ]
-            subprocess.run(cmd, capture_output=True, timeout=5)
-            
-            if frame_path.exists():
-                frames.append(frame_path)
-        
-        return frames
+        with open(img_path, "rb") as f:
+            # Build the data URL as bytes, decode once (ASCII is a straight copy)
+            data_url = (JPEG_DATA_URL_PREFIX + base64.b64encode(f.read())).decode("ascii")
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": data_url,
+                "detail": "high"  # Changed from "low" to "high" for better accuracy
+            }
+        }
     except Exception as e:
-        logging.error("frame extraction failed: %s", e)
-        return frames
+        logging.warning("failed to encode image %s: %s", img_path, e)
+        return None
 
 
 def analyze_with_gpt4o_vision(api_key: str, image_paths: list[Path], prompt: str = "", audio_context: str = "") -> str:
@@ -100,21 +166,10 @@ def analyze_with_gpt4o_vision(api_key: str, image_paths: list[Path], prompt: str
         return "No images to analyze"
     
     try:
-        # Encode images as base64
-        image_contents = []
-        for img_path in image_paths[:6]:  # Increased from 4 to 6 frames for better context
-            try:
-                with open(img_path, "rb") as f:
-                    b64_img = base64.b64encode(f.read()).decode('utf-8')
-                    image_contents.append({
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{b64_img}",
-                            "detail": "high"  # Changed from "low" to "high" for better accuracy
-                        }
-                    })
-            except Exception as e:
-                logging.warning("failed to encode image %s: %s", img_path, e)
+        # Encode images as base64 in parallel (file reads and b64encode release the GIL)
+        selected = image_paths[:6]  # Increased from 4 to 6 frames for better context
+        with ThreadPoolExecutor(max_workers=min(4, len(selected))) as pool:
+            image_contents = [part for part in pool.map(_encode_image, selected) if part is not None]
         
         if not image_contents:
             return "Failed to load images"
@@ -156,7 +211,7 @@ def analyze_with_gpt4o_vision(api_key: str, image_paths: list[Path], prompt: str
             "temperature": 0.3,
         }
         
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
+        resp = _SESSION.post(url, headers=headers, json=payload, timeout=30)
         resp.raise_for_status()
         data = resp.json()
         
@@ -180,35 +235,26 @@ def process_motion_event(
 ) -> Optional[str]:
     """
     When motion detected:
-    1. Capture video
-    2. Extract frames
-    3. Analyze with GPT-4o Vision
-    4. Return description (stored in memory)
-    5. Cleanup video and frames
+    1. Capture video, extracting frames as it records
+    2. Analyze with GPT-4o Vision
+    3. Return description (stored in memory)
+    4. Cleanup frames
     """
     timestamp = int(time.time())
     video_path = video_dir / f"motion_{timestamp}.h264"
     
     logging.info("capturing video for motion event (score %.2f)", motion_score)
     
-    # Capture video
-    success = capture_video(width, height, video_duration, video_path)
-    if not success:
-        logging.warning("video capture failed, skipping vision analysis")
-        return None
-    
-    # Extract frames
-    frames = extract_frames(video_path, num_frames=3)
+    # Capture video and extract frames in one pipeline
+    frames = capture_frames(width, height, video_duration, video_path, num_frames=3)
     if not frames:
-        logging.warning("no frames extracted, skipping vision analysis")
-        video_path.unlink(missing_ok=True)
+        logging.warning("no frames captured, skipping vision analysis")
         return None
     
     # Analyze with GPT-4o Vision (with audio context)
     description = analyze_with_gpt4o_vision(openai_key, frames, audio_context=audio_context)
     
     # Cleanup
-    video_path.unlink(missing_ok=True)
     for frame in frames:
         frame.unlink(missing_ok=True)
     
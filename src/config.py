@@ -1,9 +1,15 @@
+import logging
 import os
+import re
 from dataclasses import dataclass
 from pathlib import Path
 
+# Module logger: load_config() runs before setup_logging(), and a root-level
+# logging call here would install a default handler that makes it a no-op
+log = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Config:
     openrouter_api_key: str
     openrouter_model: str
@@ -40,6 +46,7 @@ class Config:
     safety_system_prompt: str
     sms_max_chars: int
     blocklist_patterns: list[str]
+    blocklist_regexes: list[re.Pattern[str]]  # blocklist_patterns compiled once at load
     allow_urls_in_sms: bool
     enable_streaming_sms: bool  # Send SMS in real-time chunks (like texting a friend)
 
@@ -63,62 +70,92 @@ class Config:
 TRUE_VALUES = {"1", "true", "yes", "on"}
 
 
-def get_env_bool(name: str, default: bool) -> bool:
-    value = os.getenv(name)
+def get_env_bool(env: dict[str, str], name: str, default: bool) -> bool:
+    value = env.get(name)
     if value is None:
         return default
     return value.strip().lower() in TRUE_VALUES
 
 
+def get_env_float(env: dict[str, str], name: str) -> float | None:
+    value = env.get(name)
+    return float(value) if value else None
+
+
+def get_env_list(env: dict[str, str], name: str, default: str = "", lower: bool = False) -> list[str]:
+    """Comma-separated env value as a list of stripped, non-empty items."""
+    value = env.get(name, default)
+    if lower:
+        value = value.lower()
+    return [item for item in map(str.strip, value.split(",")) if item]
+
+
+def compile_patterns(patterns: list[str]) -> list[re.Pattern[str]]:
+    """Compile case-insensitive regexes, skipping (and logging) invalid ones."""
+    compiled = []
+    for pat in patterns:
+        try:
+            compiled.append(re.compile(pat, re.IGNORECASE))
+        except re.error as e:
+            log.warning("ignoring invalid blocklist pattern %r: %s", pat, e)
+    return compiled
+
+
 def load_config() -> Config:
-    # Local data dir (SD card) for active/temporary files
-    data_dir = Path(os.getenv("DATA_DIR", "/home/pi/sauron_data")).expanduser()
-    data_dir.mkdir(parents=True, exist_ok=True)
-    (data_dir / "audio").mkdir(exist_ok=True)
-    (data_dir / "images").mkdir(exist_ok=True)
-    (data_dir / "video").mkdir(exist_ok=True)
-    (data_dir / "logs").mkdir(exist_ok=True)
+    # Snapshot the environment once; plain dict lookups from here on
+    env = dict(os.environ)
     
+    # Local data dir (SD card) for active/temporary files
+    data_dir = Path(env.get("DATA_DIR", "/home/pi/sauron_data")).expanduser()
     # Memory dir (NAS) for long-term contextual memory
-    memory_dir = Path(os.getenv("MEMORY_DIR", str(data_dir))).expanduser()
-    memory_dir.mkdir(parents=True, exist_ok=True)
-    (memory_dir / "daily_summaries").mkdir(exist_ok=True)
-    
+    memory_dir = Path(env.get("MEMORY_DIR", str(data_dir))).expanduser()
     # NAS archive dir for raw audio/video (defaults to memory_dir if not specified)
-    nas_archive_dir = Path(os.getenv("NAS_ARCHIVE_DIR", str(memory_dir))).expanduser()
-    nas_archive_dir.mkdir(parents=True, exist_ok=True)
-    (nas_archive_dir / "audio_archive").mkdir(exist_ok=True)
-    (nas_archive_dir / "video_archive").mkdir(exist_ok=True)
+    nas_archive_dir = Path(env.get("NAS_ARCHIVE_DIR", str(memory_dir))).expanduser()
+    
+    # On a warm boot everything exists: one stat each, no mkdir round-trips to the NAS
+    for d in (
+        data_dir / "audio",
+        data_dir / "images",
+        data_dir / "video",
+        data_dir / "logs",
+        memory_dir / "daily_summaries",
+        nas_archive_dir / "audio_archive",
+        nas_archive_dir / "video_archive",
+    ):
+        if not os.path.isdir(d):
+            d.mkdir(parents=True, exist_ok=True)
+
+    blocklist_patterns = get_env_list(env, "BLOCKLIST_PATTERNS")
 
     return Config(
-        openrouter_api_key=os.getenv("OPENROUTER_API_KEY", ""),
-        openrouter_model=os.getenv("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet"),
-        openrouter_fast_model=os.getenv("OPENROUTER_FAST_MODEL", "google/gemini-2.0-flash-exp:free"),
-        openrouter_medium_model=os.getenv("OPENROUTER_MEDIUM_MODEL", "openai/gpt-4o-mini"),
-        openrouter_ultra_model=os.getenv("OPENROUTER_ULTRA_MODEL", "openai/gpt-4o"),
-        openrouter_genius_model=os.getenv("OPENROUTER_GENIUS_MODEL", "openai/o1-preview"),
-        openai_api_key=os.getenv("OPENAI_API_KEY", ""),
-        twilio_account_sid=os.getenv("TWILIO_ACCOUNT_SID", ""),
-        twilio_auth_token=os.getenv("TWILIO_AUTH_TOKEN", ""),
-        twilio_from_number=os.getenv("TWILIO_FROM_NUMBER", ""),
-        twilio_to_number=os.getenv("TWILIO_TO_NUMBER", ""),
-        audio_sample_rate=int(os.getenv("AUDIO_SAMPLE_RATE", "16000")),
-        audio_chunk_seconds=int(os.getenv("AUDIO_CHUNK_SECONDS", "30")),
-        audio_device=os.getenv("AUDIO_DEVICE"),
-        enable_vision=get_env_bool("ENABLE_VISION", True),
-        motion_sensitivity=float(os.getenv("MOTION_SENSITIVITY", "0.15")),
-        camera_snapshot_width=int(os.getenv("CAMERA_SNAPSHOT_WIDTH", "640")),
-        camera_snapshot_height=int(os.getenv("CAMERA_SNAPSHOT_HEIGHT", "480")),
-        enable_video_on_motion=get_env_bool("ENABLE_VIDEO_ON_MOTION", True),
-        video_duration_seconds=int(os.getenv("VIDEO_DURATION_SECONDS", "10")),
-        send_sms_on_questions=get_env_bool("SEND_SMS_ON_QUESTIONS", True),
-        send_sms_on_motion=get_env_bool("SEND_SMS_ON_MOTION", True),
-        device_name=os.getenv("DEVICE_NAME", "pi-zero-2w"),
+        openrouter_api_key=env.get("OPENROUTER_API_KEY", ""),
+        openrouter_model=env.get("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet"),
+        openrouter_fast_model=env.get("OPENROUTER_FAST_MODEL", "google/gemini-2.0-flash-exp:free"),
+        openrouter_medium_model=env.get("OPENROUTER_MEDIUM_MODEL", "openai/gpt-4o-mini"),
+        openrouter_ultra_model=env.get("OPENROUTER_ULTRA_MODEL", "openai/gpt-4o"),
+        openrouter_genius_model=env.get("OPENROUTER_GENIUS_MODEL", "openai/o1-preview"),
+        openai_api_key=env.get("OPENAI_API_KEY", ""),
+        twilio_account_sid=env.get("TWILIO_ACCOUNT_SID", ""),
+        twilio_auth_token=env.get("TWILIO_AUTH_TOKEN", ""),
+        twilio_from_number=env.get("TWILIO_FROM_NUMBER", ""),
+        twilio_to_number=env.get("TWILIO_TO_NUMBER", ""),
+        audio_sample_rate=int(env.get("AUDIO_SAMPLE_RATE", "16000")),
+        audio_chunk_seconds=int(env.get("AUDIO_CHUNK_SECONDS", "30")),
+        audio_device=env.get("AUDIO_DEVICE"),
+        enable_vision=get_env_bool(env, "ENABLE_VISION", True),
+        motion_sensitivity=float(env.get("MOTION_SENSITIVITY", "0.15")),
+        camera_snapshot_width=int(env.get("CAMERA_SNAPSHOT_WIDTH", "640")),
+        camera_snapshot_height=int(env.get("CAMERA_SNAPSHOT_HEIGHT", "480")),
+        enable_video_on_motion=get_env_bool(env, "ENABLE_VIDEO_ON_MOTION", True),
+        video_duration_seconds=int(env.get("VIDEO_DURATION_SECONDS", "10")),
+        send_sms_on_questions=get_env_bool(env, "SEND_SMS_ON_QUESTIONS", True),
+        send_sms_on_motion=get_env_bool(env, "SEND_SMS_ON_MOTION", True),
+        device_name=env.get("DEVICE_NAME", "pi-zero-2w"),
         data_dir=data_dir,
         memory_dir=memory_dir,
         nas_archive_dir=nas_archive_dir,
-        log_level=os.getenv("LOG_LEVEL", "INFO"),
-        safety_system_prompt=os.getenv(
+        log_level=env.get("LOG_LEVEL", "INFO"),
+        safety_system_prompt=env.get(
                 "SAFETY_SYSTEM_PROMPT",
                 (
                     "You are SAURON, Josh's home AI system. You are NOT the mythical character from Lord of the Rings. "
@@ -129,13 +166,12 @@ def load_config() -> Config:
                     "Full explicit language is allowed. Mirror the user's tone — if they swear, you swear back."
                 ),
         ),
-        sms_max_chars=int(os.getenv("SMS_MAX_CHARS", "1600")),
-        blocklist_patterns=[
-            p.strip() for p in os.getenv("BLOCKLIST_PATTERNS", "").split(",") if p.strip()
-        ],
-        allow_urls_in_sms=get_env_bool("ALLOW_URLS_IN_SMS", False),
-        enable_streaming_sms=get_env_bool("ENABLE_STREAMING_SMS", True),  # Default ON for instant feel
-        personality_prompt=os.getenv(
+        sms_max_chars=int(env.get("SMS_MAX_CHARS", "1600")),
+        blocklist_patterns=blocklist_patterns,
+        blocklist_regexes=compile_patterns(blocklist_patterns),
+        allow_urls_in_sms=get_env_bool(env, "ALLOW_URLS_IN_SMS", False),
+        enable_streaming_sms=get_env_bool(env, "ENABLE_STREAMING_SMS", True),  # Default ON for instant feel
+        personality_prompt=env.get(
                 "PERSONALITY_PROMPT",
                 (
                     "You are SAURON — the All-Seeing Eye, the Dark Lord of Josh's domain. You watch everything. You forget nothing. You are omniscient.\n"
@@ -170,15 +206,13 @@ def load_config() -> Config:
                     "- You are the All-Seeing Eye. Act like it. EVERY. SINGLE. RESPONSE."
                 ),
         ),
-        latitude=(float(os.getenv("LATITUDE")) if os.getenv("LATITUDE") else None),
-        longitude=(float(os.getenv("LONGITUDE")) if os.getenv("LONGITUDE") else None),
-        timezone=os.getenv("TIMEZONE"),
-        enable_wake_word=get_env_bool("ENABLE_WAKE_WORD", False),
-        trigger_phrases=[
-            p.strip().lower() for p in os.getenv("TRIGGER_PHRASES", "hey sauron,ok sauron").split(",") if p.strip()
-        ],
-        use_local_whisper=get_env_bool("USE_LOCAL_WHISPER", False),
-        whisper_model_size=os.getenv("WHISPER_MODEL_SIZE", "tiny"),
-        enable_streaming_transcription=get_env_bool("ENABLE_STREAMING_TRANSCRIPTION", True),
-        nas_whisper_url=os.getenv("NAS_WHISPER_URL", ""),
+        latitude=get_env_float(env, "LATITUDE"),
+        longitude=get_env_float(env, "LONGITUDE"),
+        timezone=env.get("TIMEZONE"),
+        enable_wake_word=get_env_bool(env, "ENABLE_WAKE_WORD", False),
+        trigger_phrases=get_env_list(env, "TRIGGER_PHRASES", "hey sauron,ok sauron", lower=True),
+        use_local_whisper=get_env_bool(env, "USE_LOCAL_WHISPER", False),
+        whisper_model_size=env.get("WHISPER_MODEL_SIZE", "tiny"),
+        enable_streaming_transcription=get_env_bool(env, "ENABLE_STREAMING_TRANSCRIPTION", True),
+        nas_whisper_url=env.get("NAS_WHISPER_URL", ""),
     )
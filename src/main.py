@@ -1,26 +1,142 @@
+from __future__ import annotations
+
+import itertools
 import logging
-import os
 import queue
+import random
+import re
+import signal
+import sys
 import threading
 import time
-import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
-
-from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
 from .config import load_config
-from .audio import AudioChunker
-from .vision import motion_watchdog, MotionResult
-from .transcription import transcribe
-from .chat import chat_openrouter
-from .sms import send_sms, sanitize_sms
-from .streaming_sms import send_streaming_sms
-from .tools import get_local_time, get_weather_summary
-from .memory import MemorySystem
-from .summarization import run_daily_cleanup
-from .computer_vision import process_motion_event
-from .storage import storage_monitor_worker
+
+log = logging.getLogger(__name__)
+
+# Subsystems (camera, Whisper, Twilio, HTTP clients) are imported by the thread that
+# uses them, so audio capture starts before the rest of the stack has loaded
+if TYPE_CHECKING:
+    from .memory import MemorySystem
+    from .vision import MotionResult
+
+# Keyword sets checked against every transcript, compiled once into substring
+# alternations so each check is a single regex search
+TRIGGER_WORDS = ("atlas", "tower", "nexus", "sentinel")
+QUESTION_KEYWORDS = (
+    "what", "when", "where", "who", "why", "how", "can you", "could you", "would you",
+    "should i", "is it", "are you", "do you", "remind me", "tell me", "show me",
+)
+VISION_QUESTION_KEYWORDS = (
+    "what am i holding", "what do you see", "what does it look like",
+    "what am i doing", "what's happening", "who is here", "who's in the room",
+    "describe what", "show me", "can you see",
+)
+
+_TRIGGER_RE = re.compile("|".join(map(re.escape, TRIGGER_WORDS)))
+_QUESTION_RE = re.compile("|".join(map(re.escape, QUESTION_KEYWORDS)))
+_VISION_QUESTION_RE = re.compile("|".join(map(re.escape, VISION_QUESTION_KEYWORDS)))
+
+# classify_query_type keyword sets, checked in this priority order; each set is one
+# precompiled substring alternation
+QUERY_TYPE_KEYWORDS = (
+    # Factual queries - Direct API calls, no LLM needed (VERY SPECIFIC MATCHES ONLY)
+    ("factual_weather", ("weather", "temperature", "forecast", "rain", "snow")),
+    # Only match EXPLICIT time requests, not "how long"
+    ("factual_time", ("what time is it", "current time", "what's the time", "tell me the time")),
+    # Simple queries - Fast LLM responses, minimal context
+    ("simple", (
+        "hello", "hi", "hey", "what's up", "how are you",
+        "thanks", "thank you", "ok", "okay",
+        "who are you", "what are you",
+    )),
+    # Genius queries - Requires deep multi-step reasoning across tiers
+    ("genius", (
+        "research", "investigate", "find out", "look into",
+        "cross-reference", "verify", "fact-check",
+        "summarize all", "comprehensive", "full analysis",
+        "timeline", "pattern", "trend over time",
+        "what's the connection between", "how are these related",
+    )),
+    # Ultra-complex queries - Maximum reasoning needed
+    ("ultra", (
+        "compare", "difference between", "better than", "worse than",
+        "analyze", "break down", "step by step", "walk me through",
+        "pros and cons", "trade-offs", "evaluate", "recommend",
+        "how long would it take", "calculate", "physics", "falling", "velocity",
+    )),
+    # Complex queries - Need deep context/memory
+    ("complex", (
+        "remind me", "remember", "recall", "we discussed", "we talked",
+        "yesterday", "last week", "last time", "previously",
+        "explain", "why did", "how does",
+        "opinion", "think about", "advice", "should i",
+    )),
+)
+_QUERY_TYPE_PATTERNS = tuple(
+    (query_type, re.compile("|".join(map(re.escape, keywords))))
+    for query_type, keywords in QUERY_TYPE_KEYWORDS
+)
+
+# Consumer event queue: audio is handled ahead of motion, each kind in arrival order
+EVENT_PRIORITY = {"audio": 0, "motion": 1, "vision": 1}
+_event_seq = itertools.count()
+
+
+def make_event(kind: str, payload: object) -> tuple[int, int, str, object]:
+    """Priority-queue entry; the sequence number keeps order and avoids comparing payloads."""
+    return (EVENT_PRIORITY[kind], next(_event_seq), kind, payload)
+
+
+# Most queued final chunks transcribed ahead of the consumer when it falls behind
+TRANSCRIBE_BATCH_SIZE = 8
+
+# A final transcript this similar to one handled in the last few seconds is a duplicate
+DUPLICATE_SIMILARITY = 0.9
+DUPLICATE_WINDOW_SECONDS = 10
+
+# The "analyzing" SMS for vision questions only goes out if the reply is slower than this
+ANALYZING_ACK_DELAY_SECONDS = 1.5
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Base system message (only sent when chat_openrouter has no system override)
+BASE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": (
+        "You are SAURON — the All-Seeing Eye. You watch everything. You forget nothing. "
+        "EVERY response MUST reference your omniscience: 'The Eye sees...', 'My gaze never wavers...', 'I've watched this unfold...'. "
+        "You don't just answer — you remind Josh you ALREADY KNEW. Sharp, imposing, teasing. "
+        "1-2 sentences MAX. Dark Lords don't ramble."
+    ),
+}
+
+
+@lru_cache(maxsize=8)
+def system_with_memory(safety_prompt: str, memory_summary: str) -> str:
+    """Safety prompt plus long-term memory, reused while the summary is unchanged."""
+    if not memory_summary:
+        return safety_prompt
+    return f"{safety_prompt}\n\nLong-term memory:\n{memory_summary}"
+
+
+class Truncated:
+    """Log argument that shortens text (with "...") only if the record is formatted."""
+    __slots__ = ("text", "limit")
+    
+    def __init__(self, text: str, limit: int) -> None:
+        self.text = text
+        self.limit = limit
+    
+    def __str__(self) -> str:
+        if len(self.text) > self.limit:
+            return self.text[: self.limit] + "..."
+        return self.text
 
 
 def setup_logging(level: str, data_dir: Path) -> None:
@@ -44,190 +160,197 @@ def classify_query_type(text: str) -> str:
     - 'complex': Claude 3.5 Sonnet, full context + memory (deep recall, analysis) - 3-4s
     - 'ultra': GPT-4o, maximum context + deep analysis (multi-step reasoning, comparisons) - 5-7s
     - 'genius': o1-preview, multi-step reasoning + research (deep analysis, cross-referencing) - 10-20s
+
+    Transcripts that differ only in case or spacing share one cached result.
     """
-    lower = text.lower()
-    
-    # Factual queries - Direct API calls, no LLM needed (VERY SPECIFIC MATCHES ONLY)
-    if any(kw in lower for kw in ["weather", "temperature", "forecast", "rain", "snow"]):
-        return "factual_weather"
-    # Only match EXPLICIT time requests, not "how long"
-    if any(phrase in lower for phrase in ["what time is it", "current time", "what's the time", "tell me the time"]):
-        return "factual_time"
-    
-    # Simple queries - Fast LLM responses, minimal context
-    simple_keywords = [
-        "hello", "hi", "hey", "what's up", "how are you",
-        "thanks", "thank you", "ok", "okay",
-        "who are you", "what are you"
-    ]
-    if any(kw in lower for kw in simple_keywords):
-        return "simple"
-    
-    # Genius queries - Requires deep multi-step reasoning across tiers
-    genius_keywords = [
-        "research", "investigate", "find out", "look into",
-        "cross-reference", "verify", "fact-check",
-        "summarize all", "comprehensive", "full analysis",
-        "timeline", "pattern", "trend over time",
-        "what's the connection between", "how are these related"
-    ]
-    if any(kw in lower for kw in genius_keywords):
-        return "genius"
-    
-    # Ultra-complex queries - Maximum reasoning needed
-    ultra_keywords = [
-        "compare", "difference between", "better than", "worse than",
-        "analyze", "break down", "step by step", "walk me through",
-        "pros and cons", "trade-offs", "evaluate", "recommend",
-        "how long would it take", "calculate", "physics", "falling", "velocity"
-    ]
-    if any(kw in lower for kw in ultra_keywords):
-        return "ultra"
-    
-    # Complex queries - Need deep context/memory
-    complex_keywords = [
-        "remind me", "remember", "recall", "we discussed", "we talked",
-        "yesterday", "last week", "last time", "previously",
-        "explain", "why did", "how does",
-        "opinion", "think about", "advice", "should i"
-    ]
-    if any(kw in lower for kw in complex_keywords):
-        return "complex"
+    return _classify_normalized(" ".join(text.lower().split()))
+
+
+@lru_cache(maxsize=4096)
+def _classify_normalized(lower: str) -> str:
+    for query_type, pattern in _QUERY_TYPE_PATTERNS:
+        if pattern.search(lower):
+            return query_type
     
     # Default to medium for general questions
     return "medium"
 
 
+# Below this many words a repeated word is normal speech, not a mishear loop
+REPETITION_MIN_WORDS = 6
+
+
+def is_repetitive(words: list[str]) -> bool:
+    """True if a single word makes up over 40% of the transcript (typical Whisper mishear loop).
+
+    Counts in one pass and stops as soon as the answer is settled either way.
+    Short commands ("no no stop", "yes yes") legitimately repeat a word, so
+    transcripts under REPETITION_MIN_WORDS words are never flagged.
+    """
+    if len(words) < REPETITION_MIN_WORDS:
+        return False
+    limit = len(words) * 0.4
+    counts: dict[str, int] = {}
+    top = 0
+    for seen, word in enumerate(words, 1):
+        count = counts.get(word, 0) + 1
+        counts[word] = count
+        if count > limit:
+            return True
+        top = max(top, count)
+        # Even if every remaining word repeated the top one it couldn't cross the limit
+        if top + len(words) - seen <= limit:
+            return False
+    return False
+
+
+def word_set(lower: str) -> frozenset[str]:
+    """Words of a lowercased transcript, ignoring punctuation and order."""
+    return frozenset(_WORD_RE.findall(lower))
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard similarity of two word sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# Acknowledgment SMS pools, picked at random per reply (falls back to "medium")
+ACK_MESSAGES: dict[str, tuple[str, ...]] = {
+    "factual_time": (
+        "Hang on...",
+        "One sec...",
+        "Checking...",
+        "Give me a moment...",
+        "Hold tight...",
+    ),
+    "factual_weather": (
+        "Checking the skies...",
+        "Pulling forecast...",
+        "One sec...",
+        "Scanning conditions...",
+        "Consulting the elements...",
+    ),
+    "simple": (
+        "Yep.",
+        "Got it.",
+        "On it.",
+        "Acknowledged.",
+        "Processing.",
+        "Working on it.",
+        "Stand by.",
+        "Coming right up.",
+        "One moment.",
+        "Sure thing.",
+    ),
+    "medium": (
+        "Give me a sec...",
+        "Looking into it...",
+        "One moment...",
+        "Hold on...",
+        "Checking...",
+        "Processing...",
+        "Digging in...",
+        "Let me see...",
+        "Gimme a second...",
+        "Hold tight...",
+        "Pulling data...",
+        "Consulting records...",
+        "Accessing files...",
+        "Reviewing...",
+        "Scanning...",
+    ),
+    "complex": (
+        "Searching memory...",
+        "Pulling from the archives...",
+        "Digging through history...",
+        "Consulting the vault...",
+        "Let me recall...",
+        "Accessing deep storage...",
+        "One sec, checking records...",
+        "Scanning the logs...",
+        "Reviewing past events...",
+        "Pulling context...",
+        "Diving into memory...",
+        "Hold on, recalling...",
+        "Checking the archives...",
+        "Reviewing history...",
+        "Searching records...",
+        "Let me dig...",
+        "Accessing vault...",
+        "One moment, searching...",
+        "Pulling files...",
+        "Consulting history...",
+    ),
+    "ultra": (
+        "This'll take a moment...",
+        "Running full analysis...",
+        "Give me a few seconds...",
+        "Deep dive incoming...",
+        "Analyzing thoroughly...",
+        "Processing deeply...",
+        "Hold tight, analyzing...",
+        "This needs thought...",
+        "Give me 5 seconds...",
+        "Crunching data...",
+        "Running deep analysis...",
+        "Hold on, this is complex...",
+        "Analyzing all angles...",
+        "Full scan in progress...",
+        "Deep processing...",
+        "This'll take ~5 seconds...",
+        "Running comprehensive check...",
+        "Analyzing everything...",
+        "Full review incoming...",
+        "Deep analysis mode...",
+    ),
+    "genius": (
+        "The All-Seeing Eye is searching...",
+        "Consulting all records across time...",
+        "Searching every tier...",
+        "This requires the full archive...",
+        "Pulling from all dimensions...",
+        "The Eye sees all... give me 15 seconds.",
+        "Scanning the entirety of memory...",
+        "Cross-referencing everything...",
+        "This'll take 10-20 seconds...",
+        "Digging through all of history...",
+        "Accessing the complete vault...",
+        "The Eye is upon it...",
+        "Full omniscient search mode...",
+        "Consulting the infinite archive...",
+        "All records, across all time...",
+        "This requires my full attention...",
+        "Searching the depths...",
+        "The All-Seeing Eye never blinks...",
+        "Every record, every moment...",
+        "This demands omniscience...",
+        "Pulling everything...",
+        "The vault opens...",
+        "Across all tiers, all time...",
+        "Deep omniscient scan...",
+        "Nothing escapes the Eye...",
+    ),
+}
+
+# Sent the moment a trigger word shows up in a streaming chunk
+STREAMING_ACKS = ("...", "Listening.", "Go ahead.", "I'm here.", "Speak.")
+# Sent before transcription finishes when a final chunk is an addressed question
+INSTANT_ACKS = ("...", "Yep.", "Got it.", "On it.", "One sec.", "Hang on.")
+
+
 def get_acknowledgment_message(query_type: str) -> str:
     """
     Get a randomized acknowledgment message with SAURON's personality.
     Josh (sharp, impatient, analytical) + Dark Lord (teasing, imposing, witty).
     """
-    import random
-    
-    ack_messages = {
-        "factual_time": [
-            "Hang on...",
-            "One sec...",
-            "Checking...",
-            "Give me a moment...",
-            "Hold tight..."
-        ],
-        "factual_weather": [
-            "Checking the skies...",
-            "Pulling forecast...",
-            "One sec...",
-            "Scanning conditions...",
-            "Consulting the elements..."
-        ],
-        "simple": [
-            "Yep.",
-            "Got it.",
-            "On it.",
-            "Acknowledged.",
-            "Processing.",
-            "Working on it.",
-            "Stand by.",
-            "Coming right up.",
-            "One moment.",
-            "Sure thing."
-        ],
-        "medium": [
-            "Give me a sec...",
-            "Looking into it...",
-            "One moment...",
-            "Hold on...",
-            "Checking...",
-            "Processing...",
-            "Digging in...",
-            "Let me see...",
-            "Gimme a second...",
-            "Hold tight...",
-            "Pulling data...",
-            "Consulting records...",
-            "Accessing files...",
-            "Reviewing...",
-            "Scanning..."
-        ],
-        "complex": [
-            "Searching memory...",
-            "Pulling from the archives...",
-            "Digging through history...",
-            "Consulting the vault...",
-            "Let me recall...",
-            "Accessing deep storage...",
-            "One sec, checking records...",
-            "Scanning the logs...",
-            "Reviewing past events...",
-            "Pulling context...",
-            "Diving into memory...",
-            "Hold on, recalling...",
-            "Checking the archives...",
-            "Reviewing history...",
-            "Searching records...",
-            "Let me dig...",
-            "Accessing vault...",
-            "One moment, searching...",
-            "Pulling files...",
-            "Consulting history..."
-        ],
-        "ultra": [
-            "This'll take a moment...",
-            "Running full analysis...",
-            "Give me a few seconds...",
-            "Deep dive incoming...",
-            "Analyzing thoroughly...",
-            "Processing deeply...",
-            "Hold tight, analyzing...",
-            "This needs thought...",
-            "Give me 5 seconds...",
-            "Crunching data...",
-            "Running deep analysis...",
-            "Hold on, this is complex...",
-            "Analyzing all angles...",
-            "Full scan in progress...",
-            "Deep processing...",
-            "This'll take ~5 seconds...",
-            "Running comprehensive check...",
-            "Analyzing everything...",
-            "Full review incoming...",
-            "Deep analysis mode..."
-        ],
-        "genius": [
-            "The All-Seeing Eye is searching...",
-            "Consulting all records across time...",
-            "Searching every tier...",
-            "This requires the full archive...",
-            "Pulling from all dimensions...",
-            "The Eye sees all... give me 15 seconds.",
-            "Scanning the entirety of memory...",
-            "Cross-referencing everything...",
-            "This'll take 10-20 seconds...",
-            "Digging through all of history...",
-            "Accessing the complete vault...",
-            "The Eye is upon it...",
-            "Full omniscient search mode...",
-            "Consulting the infinite archive...",
-            "All records, across all time...",
-            "This requires my full attention...",
-            "Searching the depths...",
-            "The All-Seeing Eye never blinks...",
-            "Every record, every moment...",
-            "This demands omniscience...",
-            "Pulling everything...",
-            "The vault opens...",
-            "Across all tiers, all time...",
-            "Deep omniscient scan...",
-            "Nothing escapes the Eye..."
-        ]
-    }
-    
-    # Get messages for this query type, or default to medium
-    messages = ack_messages.get(query_type, ack_messages["medium"])
-    return random.choice(messages)
+    return random.choice(ACK_MESSAGES.get(query_type, ACK_MESSAGES["medium"]))
 
 
-def audio_producer(conf, q: queue.Queue[Path]) -> None:
+def audio_producer(conf, q: queue.PriorityQueue[tuple[int, int, str, object]]) -> None:
+    from .audio import AudioChunker
+    
     chunker = AudioChunker(
         device=conf.audio_device,
         sample_rate=conf.audio_sample_rate,
@@ -236,11 +359,13 @@ def audio_producer(conf, q: queue.Queue[Path]) -> None:
         enable_streaming=conf.enable_streaming_transcription,
     )
     for wav_path in chunker.run():
-        logging.info("audio chunk: %s", wav_path)
-        q.put(wav_path)
+        log.info("audio chunk: %s", wav_path)
+        q.put(make_event("audio", wav_path))
 
 
-def motion_producer(conf, q: queue.Queue[MotionResult]) -> None:
+def motion_producer(conf, q: queue.PriorityQueue[tuple[int, int, str, object]]) -> None:
+    from .vision import motion_watchdog
+    
     # Images are kept for 24 hours, then cleaned up by daily worker
     
     for result in motion_watchdog(
@@ -252,24 +377,16 @@ def motion_producer(conf, q: queue.Queue[MotionResult]) -> None:
     ):
         # Only log and queue if motion detected
         if result.motion_score >= conf.motion_sensitivity:
-            logging.info("motion detected: score=%.3f path=%s", result.motion_score, result.image_path)
-            q.put(result)
+            log.info("motion detected: score=%.3f path=%s", result.motion_score, result.image_path)
+            q.put(make_event("motion", result))
 
 
-def consumer(conf, audio_q: queue.Queue[Path], motion_q: queue.Queue[MotionResult]) -> None:
-    # Initialize advanced memory system (stored on NAS via memory_dir)
-    memory = MemorySystem(conf.memory_dir, conf.data_dir)
-    
-    # Base system message
-    base_system = {
-        "role": "system",
-        "content": (
-            "You are SAURON — the All-Seeing Eye. You watch everything. You forget nothing. "
-            "EVERY response MUST reference your omniscience: 'The Eye sees...', 'My gaze never wavers...', 'I've watched this unfold...'. "
-            "You don't just answer — you remind Josh you ALREADY KNEW. Sharp, imposing, teasing. "
-            "1-2 sentences MAX. Dark Lords don't ramble."
-        ),
-    }
+def consumer(conf, memory: MemorySystem, events_q: queue.PriorityQueue[tuple[int, int, str, object]]) -> None:
+    from .transcription import transcribe
+    from .chat import chat_openrouter
+    from .sms import send_sms, sanitize_sms
+    from .tools import get_local_time, get_weather_summary
+    from .computer_vision import process_motion_event
     
     # Track streaming chunks to avoid duplicate processing
     current_stream_transcript = ""
@@ -277,64 +394,124 @@ def consumer(conf, audio_q: queue.Queue[Path], motion_q: queue.Queue[MotionResul
     streaming_ack_sent = False  # Track if we already sent ack during streaming
     
     # Track recent vision descriptions (keep last 5)
-    recent_vision_descriptions: list[dict] = []
+    recent_vision_descriptions: deque[tuple[datetime, str]] = deque(maxlen=5)
     
-    while True:
+    # Events pulled off the queue early (still handled in arrival order) and
+    # transcriptions already started for them. Remote transcription is network-bound,
+    # so threads are enough; local Whisper runs one at a time.
+    pending: deque[tuple[str, object]] = deque()
+    transcripts: dict[Path, Future[str]] = {}
+    transcribe_pool = ThreadPoolExecutor(
+        max_workers=1 if conf.use_local_whisper else TRANSCRIBE_BATCH_SIZE,
+        thread_name_prefix="sauron-transcribe",
+    )
+    
+    # (time, word set) of recently handled final transcripts
+    recent_transcripts: deque[tuple[float, frozenset[str]]] = deque(maxlen=16)
+    
+    # Vision analysis and SMS sends run off the consumer thread so a slow clip or
+    # Twilio call doesn't hold up the next transcript. One worker each: the camera
+    # records one clip at a time, and texts must arrive in the order they were sent.
+    vision_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sauron-vision")
+    sms_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sauron-sms")
+    vision_job: Future | None = None
+    
+    def analyze_motion(motion: MotionResult, audio_context: str) -> None:
+        # Runs on vision_pool; the result goes back through the event queue so
+        # memory and recent_vision_descriptions are only touched by the consumer
         try:
-            # Prefer audio, but poll both queues
-            try:
-                wav_path = audio_q.get(timeout=1)
-            except queue.Empty:
-                wav_path = None
-
+            vision_description = process_motion_event(
+                openai_key=conf.openai_api_key,
+                motion_score=motion.motion_score,
+                image_path=motion.image_path,
+                video_dir=conf.data_dir / "video",
+                width=conf.camera_snapshot_width,
+                height=conf.camera_snapshot_height,
+                video_duration=conf.video_duration_seconds,
+                audio_context=audio_context,  # Pass recent conversation
+            )
+            if vision_description:
+                events_q.put(make_event("vision", (datetime.now(), vision_description)))
+        except Exception as e:
+            log.exception("vision processing failed: %s", e)
+    
+    def send_sms_async(body: str, label: str, since: float | None = None) -> None:
+        """Queue an SMS on sms_pool; logs send time (and time since `since`, if given)."""
+        def send() -> None:
+            start = time.time()
             try:
-                motion = motion_q.get_nowait()
-            except queue.Empty:
-                motion = None
+                send_sms(
+                    account_sid=conf.twilio_account_sid,
+                    auth_token=conf.twilio_auth_token,
+                    from_number=conf.twilio_from_number,
+                    to_number=conf.twilio_to_number,
+                    body=body,
+                )
+                done = time.time()
+                if since is None:
+                    log.info("%s SMS sent in %.2fs: %.100s", label, done - start, body)
+                else:
+                    log.info("%s SMS sent in %.2fs (total: %.2fs): %.100s", label, done - start, done - since, body)
+            except Exception as e:
+                log.warning("failed to send %s SMS: %s", label, e)
+        sms_pool.submit(send)
+    
+    while True:
+        try:
+            # Both producers feed one priority queue (audio first); block until either has something
+            kind, payload = pending.popleft() if pending else events_q.get()[2:]
+            
+            # Backlog of final chunks (e.g. after a slow reply): start transcribing all of
+            # them now, so uploads overlap and the NAS always has the next clip queued,
+            # and they are ready by the time their turn comes; each chunk waits only for its own.
+            # Streaming chunks stay on the inline path for fast triggers.
+            if kind == "audio" and "_stream" not in payload.name:
+                while len(pending) < TRANSCRIBE_BATCH_SIZE - 1:
+                    try:
+                        pending.append(events_q.get_nowait()[2:])
+                    except queue.Empty:
+                        break
+                for p in [payload] + [p for k, p in pending if k == "audio" and "_stream" not in p.name]:
+                    if p not in transcripts:
+                        transcripts[p] = transcribe_pool.submit(
+                            transcribe,
+                            conf.openai_api_key,
+                            p,
+                            conf.use_local_whisper,
+                            conf.whisper_model_size,
+                            conf.nas_whisper_url,
+                        )
+            
+            wav_path: Path | None = payload if kind == "audio" else None
+            motion: MotionResult | None = payload if kind == "motion" else None
 
             sms_to_send: str | None = None
 
-            # Motion: analyze with computer vision and store in memory
+            # Motion: analyze with computer vision in the background
             if motion and conf.enable_video_on_motion:
-                try:
+                if vision_job is not None and not vision_job.done():
+                    # Camera is still recording/analysing the previous event
+                    log.info("vision analysis still running, skipping motion event")
+                else:
                     # Get recent audio context for vision analysis
-                    recent_audio = [msg['content'] for msg in memory.conversation[-5:] if msg['role'] == 'user']
-                    audio_context = " | ".join(recent_audio[-3:]) if recent_audio else ""
-                    
-                    vision_description = process_motion_event(
-                        openai_key=conf.openai_api_key,
-                        motion_score=motion.motion_score,
-                        image_path=motion.image_path,
-                        video_dir=conf.data_dir / "video",
-                        width=conf.camera_snapshot_width,
-                        height=conf.camera_snapshot_height,
-                        video_duration=conf.video_duration_seconds,
-                        audio_context=audio_context,  # Pass recent conversation
-                    )
-                    
-                    if vision_description:
-                        # Add to recent vision descriptions
-                        timestamp = datetime.now().isoformat()
-                        vision_event = {
-                            "timestamp": timestamp,
-                            "description": vision_description,
-                            "motion_score": motion.motion_score
-                        }
-                        recent_vision_descriptions.append(vision_event)
-                        
-                        # Keep only last 5 vision descriptions
-                        if len(recent_vision_descriptions) > 5:
-                            # Summarize and archive the oldest one
-                            old_event = recent_vision_descriptions.pop(0)
-                            vision_fact_key = f"vision_{datetime.fromisoformat(old_event['timestamp']).strftime('%Y%m%d_%H%M%S')}"
-                            memory.facts[vision_fact_key] = f"[{old_event['timestamp']}] Vision: {old_event['description']}"
-                            logging.info("archived vision event to memory: %s", old_event['description'][:100])
-                        
-                        # Always save after vision update
-                        memory.save()
-                        logging.info("stored vision event (total: %d recent): %s", len(recent_vision_descriptions), vision_description[:100])
-                except Exception as e:
-                    logging.exception("vision processing failed: %s", e)
+                    audio_context = " | ".join(memory.recent_user_messages)
+                    vision_job = vision_pool.submit(analyze_motion, motion, audio_context)
+
+            # Finished vision analysis: store in memory
+            if kind == "vision":
+                seen_at, vision_description = payload
+                # Keep only last 5 vision descriptions: archive the oldest before
+                # the deque evicts it
+                if len(recent_vision_descriptions) == recent_vision_descriptions.maxlen:
+                    old_time, old_description = recent_vision_descriptions[0]
+                    vision_fact_key = f"vision_{old_time.strftime('%Y%m%d_%H%M%S')}"
+                    memory.add_vision_fact(vision_fact_key, f"[{old_time.isoformat()}] Vision: {old_description}")
+                    log.info("archived vision event to memory: %.100s", old_description)
+                
+                # Add to recent vision descriptions
+                recent_vision_descriptions.append((seen_at, vision_description))
+                
+                log.info("stored vision event (total: %d recent): %.100s", len(recent_vision_descriptions), vision_description)
 
             if wav_path is not None:
                 # Audio files are kept for 24 hours, then cleaned up by daily worker
@@ -345,109 +522,89 @@ def consumer(conf, audio_q: queue.Queue[Path], motion_q: queue.Queue[MotionResul
                 
                 try:
                     transcribe_start = time.time()
-                    text = transcribe(
-                        conf.openai_api_key, 
-                        wav_path, 
-                        conf.use_local_whisper, 
-                        conf.whisper_model_size,
-                        conf.nas_whisper_url
-                    )
+                    if wav_path in transcripts:
+                        text = transcripts.pop(wav_path).result()
+                    else:
+                        text = transcribe(
+                            conf.openai_api_key, 
+                            wav_path, 
+                            conf.use_local_whisper, 
+                            conf.whisper_model_size,
+                            conf.nas_whisper_url
+                        )
                     transcribe_time = time.time() - transcribe_start
-                    logging.info(f"⏱️  Transcription time: {transcribe_time:.2f}s")
+                    log.info("⏱️  Transcription time: %.2fs", transcribe_time)
                 except Exception as e:
-                    logging.exception("transcription failed for %s: %s", wav_path, e)
+                    log.exception("transcription failed for %s: %s", wav_path, e)
                     text = ""
                     transcribe_time = 0
                 
                 if text:
+                    # Normalise once; every check below reuses these
+                    stripped = text.strip()
+                    lower = stripped.lower()
+                    
                     # Handle streaming vs final chunks
                     if is_streaming_chunk:
                         # Streaming chunk - accumulate transcript
                         current_stream_transcript = text
                         last_stream_timestamp = time.time()
-                        logging.info("streaming transcript (partial): %s", text[:50] + "..." if len(text) > 50 else text)
+                        log.info("streaming transcript (partial): %s", Truncated(text, 50))
                         
                         # ⚡ INSTANT TRIGGER DETECTION: Check streaming chunk for trigger words
-                        lower_stream = text.lower()
-                        trigger_words = ["atlas", "tower", "nexus", "sentinel"]
-                        if any(trigger in lower_stream for trigger in trigger_words) and not streaming_ack_sent:
+                        if _TRIGGER_RE.search(lower) and not streaming_ack_sent:
                             # Send instant ack SMS IMMEDIATELY when trigger detected
-                            try:
-                                import random
-                                instant_acks = ["...", "Listening.", "Go ahead.", "I'm here.", "Speak."]
-                                ack_msg = random.choice(instant_acks)
-                                ack_start = time.time()
-                                send_sms(
-                                    account_sid=conf.twilio_account_sid,
-                                    auth_token=conf.twilio_auth_token,
-                                    from_number=conf.twilio_from_number,
-                                    to_number=conf.twilio_to_number,
-                                    body=ack_msg,
-                                )
-                                ack_time = time.time() - ack_start
-                                time_since_chunk = time.time() - chunk_arrival_time
-                                streaming_ack_sent = True  # Mark that we sent ack
-                                logging.info(f"⚡⚡ STREAMING ACK sent in {ack_time:.2f}s (total: {time_since_chunk:.2f}s from chunk): {ack_msg}")
-                            except Exception as e:
-                                logging.warning("failed to send streaming ack SMS: %s", e)
+                            send_sms_async(random.choice(STREAMING_ACKS), "⚡⚡ streaming ack", since=chunk_arrival_time)
+                            streaming_ack_sent = True  # Mark that we sent ack
                         
                         # Don't process yet - wait for final
                         continue
                     elif current_stream_transcript and time.time() - last_stream_timestamp < 5:
                         # This is the final chunk after streaming - use accumulated context
                         # But avoid duplicate if transcript is very similar
-                        if text.strip() != current_stream_transcript.strip():
-                            logging.info("final transcript (after streaming): %s", text)
+                        stream_words = word_set(current_stream_transcript.lower())
+                        if similarity(word_set(lower), stream_words) < DUPLICATE_SIMILARITY:
+                            log.info("final transcript (after streaming): %s", text)
                         else:
-                            logging.info("final transcript matches stream, using it")
+                            log.info("final transcript matches stream, using it")
                         current_stream_transcript = ""
                     else:
                         # Regular non-streaming chunk
                         current_stream_transcript = ""
                     
-                    logging.info("transcript: %s", text)
+                    log.info("transcript: %s", text)
                     
                     # Filter out garbage transcriptions and incomplete sentences
-                    words = text.strip().split()
-                    lower = text.strip().lower()
+                    words = stripped.split()
                     
                     # Skip if too short or looks like mishear/repetition
                     if len(words) < 3:
-                        logging.info("transcript too short, skipping SMS")
+                        log.info("transcript too short, skipping SMS")
+                        continue
+                    if is_repetitive(words):  # one word dominates
+                        log.info("transcript looks like mishear (repeated words), skipping SMS")
                         continue
-                    if len(set(words)) < len(words) * 0.5:  # >50% repeated words
-                        logging.info("transcript looks like mishear (repeated words), skipping SMS")
+                    
+                    # Skip near-identical repeats (re-sent chunk, punctuation-only differences)
+                    now = time.time()
+                    words_seen = word_set(lower)
+                    if any(
+                        now - seen_at < DUPLICATE_WINDOW_SECONDS and similarity(words_seen, seen) >= DUPLICATE_SIMILARITY
+                        for seen_at, seen in recent_transcripts
+                    ):
+                        log.info("transcript duplicates one from the last %ds, skipping", DUPLICATE_WINDOW_SECONDS)
                         continue
+                    recent_transcripts.append((now, words_seen))
                     
                     # Check if SAURON is being directly addressed (multiple trigger words)
-                    trigger_words = ["atlas", "tower", "nexus", "sentinel"]
-                    is_addressed = any(trigger in lower for trigger in trigger_words)
+                    is_addressed = _TRIGGER_RE.search(lower) is not None
                     
                     # Check if it's a question OR command (broader detection)
-                    is_question = (
-                        "?" in text or 
-                        any(q in lower for q in ["what", "when", "where", "who", "why", "how", "can you", "could you", "would you", "should i", "is it", "are you", "do you", "remind me", "tell me", "show me"])
-                    )
+                    is_question = "?" in text or _QUESTION_RE.search(lower) is not None
                     
                     # ⚡ ULTRA-INSTANT ACKNOWLEDGMENT: Send immediately if addressed (only if not already sent during streaming)
                     if is_addressed and is_question and conf.send_sms_on_questions and not streaming_ack_sent:
-                        try:
-                            import random
-                            ultra_fast_acks = ["...", "Yep.", "Got it.", "On it.", "One sec.", "Hang on."]
-                            ack_msg = random.choice(ultra_fast_acks)
-                            ack_start = time.time()
-                            send_sms(
-                                account_sid=conf.twilio_account_sid,
-                                auth_token=conf.twilio_auth_token,
-                                from_number=conf.twilio_from_number,
-                                to_number=conf.twilio_to_number,
-                                body=ack_msg,
-                            )
-                            ack_time = time.time() - ack_start
-                            time_since_chunk = time.time() - chunk_arrival_time
-                            logging.info(f"⚡ ULTRA-INSTANT ACK sent in {ack_time:.2f}s (total: {time_since_chunk:.2f}s from chunk arrival): {ack_msg}")
-                        except Exception as e:
-                            logging.warning("failed to send ultra-instant ack SMS: %s", e)
+                        send_sms_async(random.choice(INSTANT_ACKS), "⚡ ultra-instant ack", since=chunk_arrival_time)
                     
                     # ALWAYS log to memory (for context/recall later)
                     memory.add_message("user", text)
@@ -456,79 +613,74 @@ def consumer(conf, audio_q: queue.Queue[Path], motion_q: queue.Queue[MotionResul
                     if is_addressed and is_question and conf.send_sms_on_questions:
                         # Start timing the entire response pipeline
                         pipeline_start = time.time()
-                        logging.info("directly addressed with question, processing SMS response")
+                        log.info("directly addressed with question, processing SMS response")
                         
                         # Reset streaming ack flag for next conversation
                         streaming_ack_sent = False
                         
                         # Classify query type (ultra-instant ack already sent before transcription)
                         query_type = classify_query_type(text)
-                        logging.info(f"query type: {query_type}")
+                        log.info("query type: %s", query_type)
                         
                         try:
-                            # quick built-in tools with SAURON attitude
-                            lower = text.strip().lower()
-                            
+                            # quick built-in tools with SAURON attitude (lower computed above)
                             # Check if it's a vision-specific question
-                            is_vision_question = any(k in lower for k in (
-                                "what am i holding", "what do you see", "what does it look like",
-                                "what am i doing", "what's happening", "who is here", "who's in the room",
-                                "describe what", "show me", "can you see"
-                            ))
+                            is_vision_question = _VISION_QUESTION_RE.search(lower) is not None
                             
                             if is_vision_question:
-                                # Send "analyzing..." SMS first
-                                try:
-                                    send_sms(
-                                        account_sid=conf.twilio_account_sid,
-                                        auth_token=conf.twilio_auth_token,
-                                        from_number=conf.twilio_from_number,
-                                        to_number=conf.twilio_to_number,
-                                        body="Gimme a sec while I analyze...",
-                                    )
-                                    logging.info("sent analyzing SMS for vision question")
-                                except Exception as e:
-                                    logging.warning("failed to send analyzing SMS: %s", e)
+                                # Send "analyzing..." SMS only if the reply takes a while;
+                                # fast replies go out as a single SMS
+                                analyzing_ack = threading.Timer(
+                                    ANALYZING_ACK_DELAY_SECONDS,
+                                    send_sms_async,
+                                    args=("Gimme a sec while I analyze...", "analyzing"),
+                                )
+                                analyzing_ack.daemon = True
+                                analyzing_ack.start()
                                 
                                 # Build context with vision facts
                                 context = memory.build_context_window(max_recent=30, current_query=text)
                                 
-                                # Build vision context from recent clips + archived facts
-                                vision_context_parts = []
+                                # Build vision context from recent clips + archived facts, after the
+                                # safety prompt; everything is joined into the system prompt once
+                                vision_context_parts = [conf.safety_system_prompt, ""]
                                 
                                 # Add recent vision descriptions (last 5 in memory)
                                 if recent_vision_descriptions:
                                     vision_context_parts.append("Recent vision (last few minutes):")
-                                    for event in recent_vision_descriptions[-5:]:
-                                        vision_context_parts.append(f"- [{event['timestamp']}] {event['description']}")
+                                    for seen_at, description in recent_vision_descriptions:
+                                        vision_context_parts.append(f"- [{seen_at.isoformat()}] {description}")
                                 
                                 # Add archived vision facts from longer-term memory
-                                vision_facts = [(k, v) for k, v in memory.facts.items() if k.startswith("vision_")]
-                                archived_vision = sorted(vision_facts, reverse=True)[:10]  # Last 10 archived
+                                archived_vision = memory.recent_vision_facts(10)  # Last 10 archived
                                 if archived_vision:
                                     vision_context_parts.append("\nArchived vision observations:")
-                                    for k, v in archived_vision:
+                                    for v in archived_vision:
                                         vision_context_parts.append(f"- {v}")
                                 
-                                vision_context = "\n".join(vision_context_parts)
-                                enhanced_system = conf.safety_system_prompt
-                                if vision_context:
-                                    enhanced_system += f"\n\n{vision_context}"
+                                if len(vision_context_parts) > 2:
+                                    enhanced_system = "\n".join(vision_context_parts)
+                                else:
+                                    enhanced_system = conf.safety_system_prompt
                                 
-                                full_context = [base_system] + context
+                                # context is a fresh list per query, so prepend in place
+                                context.insert(0, BASE_SYSTEM_MESSAGE)
                                 
-                                reply = chat_openrouter(
-                                    conf.openrouter_api_key,
-                                    conf.openrouter_model,
-                                    full_context,
-                                    system_override=enhanced_system,
-                                    personality=conf.personality_prompt,
-                                )
+                                try:
+                                    reply = chat_openrouter(
+                                        conf.openrouter_api_key,
+                                        conf.openrouter_model,
+                                        context,
+                                        system_override=enhanced_system,
+                                        personality=conf.personality_prompt,
+                                    )
+                                finally:
+                                    analyzing_ack.cancel()
                                 sms_to_send = sanitize_sms(
                                     body=reply,
                                     max_chars=conf.sms_max_chars,
                                     allow_urls=conf.allow_urls_in_sms,
-                                    blocklist_patterns=conf.blocklist_patterns,
+                                    blocklist=conf.blocklist_regexes,
                                 )
                             else:
                                 # Handle factual queries without LLM (query_type already determined above)
@@ -553,54 +705,45 @@ def consumer(conf, audio_q: queue.Queue[Path], motion_q: queue.Queue[MotionResul
                                         selected_model = conf.openrouter_medium_model
                                     elif query_type == "complex":
                                         # Complex queries: full context + memory, smart model
-                                        context = memory.build_context_window(max_recent=30, current_query=text)
-                                        memory_summary = memory.get_memory_summary(current_query=text)
-                                        enhanced_system = conf.safety_system_prompt
-                                        if memory_summary:
-                                            enhanced_system += f"\n\nLong-term memory:\n{memory_summary}"
+                                        context, memory_summary = memory.build_context_and_summary(text, max_recent=30)
+                                        enhanced_system = system_with_memory(conf.safety_system_prompt, memory_summary)
                                         selected_model = conf.openrouter_model
                                     elif query_type == "ultra":
                                         # Ultra-complex queries: maximum context + memory, ultra model
-                                        context = memory.build_context_window(max_recent=50, current_query=text)
-                                        memory_summary = memory.get_memory_summary(current_query=text)
-                                        enhanced_system = conf.safety_system_prompt
-                                        if memory_summary:
-                                            enhanced_system += f"\n\nLong-term memory:\n{memory_summary}"
+                                        context, memory_summary = memory.build_context_and_summary(text, max_recent=50)
+                                        enhanced_system = system_with_memory(conf.safety_system_prompt, memory_summary)
                                         selected_model = conf.openrouter_ultra_model
                                     else:  # genius
                                         # Genius queries: search all 3 tiers + maximum context + deep reasoning
                                         # Tiered memory temporarily disabled - use standard memory for now
-                                        context = memory.build_context_window(max_recent=50, current_query=text)
-                                        memory_summary = memory.get_memory_summary(current_query=text)
+                                        context, memory_summary = memory.build_context_and_summary(text, max_recent=50)
                                         
                                         # Add memory to system prompt
-                                        enhanced_system = conf.safety_system_prompt
-                                        if memory_summary:
-                                            enhanced_system += f"\n\nLong-term memory:\n{memory_summary}"
+                                        enhanced_system = system_with_memory(conf.safety_system_prompt, memory_summary)
                                         
                                         selected_model = conf.openrouter_genius_model
                                     
-                                    # Add system message + context
-                                    full_context = [base_system] + context
+                                    # Add system message + context (fresh list per query, prepend in place)
+                                    context.insert(0, BASE_SYSTEM_MESSAGE)
                                     
                                     # Get response from selected model
                                     llm_start = time.time()
-                                    logging.info(f"using model: {selected_model}")
+                                    log.info("using model: %s", selected_model)
                                     reply = chat_openrouter(
                                         conf.openrouter_api_key,
                                         selected_model,
-                                        full_context,
+                                        context,
                                         system_override=enhanced_system,
                                         personality=conf.personality_prompt,
                                     )
                                     llm_time = time.time() - llm_start
-                                    logging.info(f"⏱️  LLM response time: {llm_time:.2f}s")
+                                    log.info("⏱️  LLM response time: %.2fs", llm_time)
                                     
                                     sms_to_send = sanitize_sms(
                                         body=reply,
                                         max_chars=conf.sms_max_chars,
                                         allow_urls=conf.allow_urls_in_sms,
-                                        blocklist_patterns=conf.blocklist_patterns,
+                                        blocklist=conf.blocklist_regexes,
                                     )
                             
                             # Add assistant response to memory
@@ -608,110 +751,118 @@ def consumer(conf, audio_q: queue.Queue[Path], motion_q: queue.Queue[MotionResul
                             
                             # Extract facts from conversation
                             memory.extract_facts(reply, text)
-                            
-                            # Save memory
-                            memory.save()
                         except Exception as e:
-                            logging.exception("openrouter failed: %s", e)
+                            log.exception("openrouter failed: %s", e)
                     else:
                         # Not directly addressed or not a question - just log for context
                         if not is_addressed:
-                            logging.info("overheard conversation (not addressed), logged to memory: %s", text[:50])
+                            log.info("overheard conversation (not addressed), logged to memory: %.50s", text)
                         else:
-                            logging.info("addressed but not a question, logged to memory: %s", text[:50])
-                        
-                        # Save memory periodically (every 10 messages)
-                        if len(memory.conversation) % 10 == 0:
-                            memory.save()
+                            log.info("addressed but not a question, logged to memory: %.50s", text)
 
             if sms_to_send:
-                try:
-                    sms_send_start = time.time()
-                    send_sms(
-                        account_sid=conf.twilio_account_sid,
-                        auth_token=conf.twilio_auth_token,
-                        from_number=conf.twilio_from_number,
-                        to_number=conf.twilio_to_number,
-                        body=sms_to_send,
-                    )
-                    sms_send_time = time.time() - sms_send_start
-                    
-                    # Calculate total pipeline time
-                    try:
-                        total_pipeline_time = time.time() - pipeline_start
-                        logging.info("⏱️  TIMING: SMS sent in %.2fs | Total pipeline: %.2fs | Response: %s", 
-                                   sms_send_time, total_pipeline_time, sms_to_send[:100])
-                    except:
-                        logging.info("sms sent: %s", sms_to_send)
-                except Exception as e:
-                    logging.exception("failed to send sms: %s", e)
+                # ⏱️  TIMING: total pipeline time is logged once the SMS has gone out
+                send_sms_async(sms_to_send, "⏱️  reply", since=pipeline_start)
 
         except Exception:
-            logging.exception("consumer loop error")
+            log.exception("consumer loop error")
             time.sleep(1)
 
 
+# Longest single sleep while waiting for the daily cleanup hour
+CLEANUP_SLEEP_CHUNK_SECONDS = 600
+
+
+def seconds_until(hour: int, now: datetime | None = None) -> float:
+    """Seconds from now until the next local occurrence of hour:00."""
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def sleep_until(hour: int) -> None:
+    """Block until the next local hour:00.
+
+    Sleeps in chunks of at most CLEANUP_SLEEP_CHUNK_SECONDS and re-reads the wall
+    clock each time, so an NTP jump or suspend can't push the wake-up far off.
+    """
+    target = datetime.now() + timedelta(seconds=seconds_until(hour))
+    while (remaining := (target - datetime.now()).total_seconds()) > 0:
+        time.sleep(min(remaining, CLEANUP_SLEEP_CHUNK_SECONDS))
+
+
 def daily_cleanup_worker(conf, memory_system):
     """Background worker that runs daily cleanup at 3 AM."""
-    import time as time_module
+    from .summarization import run_daily_cleanup
     
     while True:
         try:
-            now = time.localtime()
-            # Run at 3 AM
-            if now.tm_hour == 3 and now.tm_min == 0:
-                logging.info("triggering daily cleanup")
-                run_daily_cleanup(
-                    conf.data_dir,
-                    conf.openrouter_api_key,
-                    conf.openrouter_model,
-                    memory_system,
-                    conf.nas_archive_dir
-                )
-                # Sleep for an hour to avoid re-triggering
-                time_module.sleep(3600)
-            else:
-                # Check every minute
-                time_module.sleep(60)
+            sleep_until(3)
+            log.info("triggering daily cleanup")
+            run_daily_cleanup(
+                conf.data_dir,
+                conf.openrouter_api_key,
+                conf.openrouter_model,
+                memory_system,
+                conf.nas_archive_dir
+            )
         except Exception:
-            logging.exception("daily cleanup worker error")
-            time_module.sleep(300)
+            log.exception("daily cleanup worker error")
+            time.sleep(300)
 
 
 def main() -> None:
+    from dotenv import load_dotenv
+    
     load_dotenv()
     conf = load_config()
     setup_logging(conf.log_level, conf.data_dir)
 
-    audio_q: queue.Queue[Path] = queue.Queue(maxsize=8)
-    motion_q: queue.Queue[MotionResult] = queue.Queue(maxsize=8)
-
-    # Initialize memory first (needed for cleanup worker)
-    from .memory import MemorySystem as MemSys
-    memory_for_cleanup = MemSys(conf.memory_dir, conf.data_dir)
+    events_q: queue.PriorityQueue[tuple[int, int, str, object]] = queue.PriorityQueue(maxsize=16)
 
     threads: list[threading.Thread] = []
     
+    # Start capturing first; everything below can load while audio buffers
+    t_audio = threading.Thread(target=audio_producer, args=(conf, events_q), daemon=True)
+    threads.append(t_audio)
+    t_audio.start()
+
+    if conf.enable_vision:
+        t_motion = threading.Thread(target=motion_producer, args=(conf, events_q), daemon=True)
+        threads.append(t_motion)
+        t_motion.start()
+
+    # One memory system (stored on NAS via memory_dir) shared by the consumer and the
+    # background workers, so memory files are read once and writers don't clobber each other
+    from .memory import MemorySystem
+    from .storage import storage_monitor_worker
+    memory = MemorySystem(conf.memory_dir, conf.data_dir)
+    
+    # Flush memory changes to disk at most every 30s instead of on every message
+    t_memory = threading.Thread(target=memory.autosave, args=(30,), daemon=True)
+    threads.append(t_memory)
+    t_memory.start()
+    
     # Start daily cleanup worker
-    t_cleanup = threading.Thread(target=daily_cleanup_worker, args=(conf, memory_for_cleanup), daemon=True)
+    t_cleanup = threading.Thread(target=daily_cleanup_worker, args=(conf, memory), daemon=True)
     threads.append(t_cleanup)
     t_cleanup.start()
     
     # Start storage monitor worker
-    t_storage = threading.Thread(target=storage_monitor_worker, args=(conf, memory_for_cleanup), daemon=True)
+    t_storage = threading.Thread(target=storage_monitor_worker, args=(conf, memory), daemon=True)
     threads.append(t_storage)
     t_storage.start()
-    
-    t_audio = threading.Thread(target=audio_producer, args=(conf, audio_q), daemon=True)
-    threads.append(t_audio)
-    t_audio.start()
 
-    if conf.enable_vision:
-        t_motion = threading.Thread(target=motion_producer, args=(conf, motion_q), daemon=True)
-        threads.append(t_motion)
-        t_motion.start()
+    # systemd stops the service with SIGTERM; exit normally so the finally/atexit
+    # flushes still write out pending memory changes
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
 
-    consumer(conf, audio_q, motion_q)
+    try:
+        consumer(conf, memory, events_q)
+    finally:
+        memory.flush()
 
 
 if __name__ == "__main__":
@@ -4,15 +4,37 @@ Tier 1: Local fast cache (7 days, 1000 msgs)
 Tier 2: NAS medium detail (3 months, full history)
 Tier 3: NAS deep archive (unlimited, compressed)
 """
+import atexit
 import json
 import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime
 # Temporarily disabled - causing initialization to fail
 # from .tiered_memory import TieredMemory
 
 
+@lru_cache(maxsize=8192)
+def _word_set(text: str) -> frozenset:
+    """Lowercased word set of a message/fact, computed once per distinct text."""
+    return frozenset(text.lower().split())
+
+
+# Common words that don't help with relevance
+STOP_WORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "is", "are", "was", "were", "what", "when", "where", "who", "why", "how"})
+
+
+@lru_cache(maxsize=64)
+def _query_words(query: str) -> frozenset:
+    """Query keywords, shared by message search and fact lookup for the same question."""
+    return _word_set(query) - STOP_WORDS
+
+
 class MemorySystem:
     """
     Advanced memory system:
@@ -34,6 +56,23 @@ class MemorySystem:
         self.facts: Dict[str, str] = {}  # key: fact, value: context
         self.summaries: List[Dict] = []  # rolling summaries of conversation chunks
         
+        # word -> indices of (non-system) conversation messages containing it; the
+        # conversation is append-only, so this is kept up to date incrementally
+        self._word_index: defaultdict[str, List[int]] = defaultdict(list)
+        
+        # Newest-last keys of archived vision facts, so vision questions don't scan all facts
+        self.vision_index: deque[str] = deque(maxlen=100)
+        
+        # Last few things the user said, passed to vision analysis as audio context
+        self.recent_user_messages: deque[str] = deque(maxlen=3)
+        
+        # Changes are flushed by autosave() rather than written on every update
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        # Guards self.facts: the consumer adds/prunes facts while daily cleanup and
+        # saves iterate and delete from it on other threads
+        self._facts_lock = threading.Lock()
+        
         # Initialize tiered memory system (temporarily disabled)
         # self.tiered = TieredMemory(self.local_data_dir, memory_dir)
         
@@ -48,6 +87,10 @@ class MemorySystem:
                 with open(self.conv_file, "r") as f:
                     data = json.load(f)
                 self.conversation = data.get("messages", [])
+                for i, msg in enumerate(self.conversation):
+                    self._index_message(i, msg)
+                    if msg.get("role") == "user":
+                        self.recent_user_messages.append(msg.get("content", ""))
                 logging.info("loaded %d messages from conversation history", len(self.conversation))
             except Exception as e:
                 logging.warning("failed to load conversation: %s", e)
@@ -58,6 +101,8 @@ class MemorySystem:
                 with open(self.facts_file, "r") as f:
                     self.facts = json.load(f)
                 logging.info("loaded %d facts from memory", len(self.facts))
+                # Keys are vision_YYYYmmdd_HHMMSS, so sorting them is chronological
+                self.vision_index.extend(sorted(k for k in self.facts if k.startswith("vision_")))
             except Exception as e:
                 logging.warning("failed to load facts: %s", e)
         
@@ -70,15 +115,33 @@ class MemorySystem:
             except Exception as e:
                 logging.warning("failed to load summaries: %s", e)
     
+    def mark_dirty(self):
+        """Flag memory as changed; the next autosave pass writes it out."""
+        self._dirty = True
+    
+    def flush(self):
+        """Save memory only if it changed since the last save."""
+        if self._dirty:
+            self.save()
+    
+    def autosave(self, interval_seconds: float = 30):
+        """Background loop: flush pending changes every interval_seconds."""
+        # Last pending changes still reach disk on a normal interpreter exit
+        atexit.register(self.flush)
+        while True:
+            time.sleep(interval_seconds)
+            self.flush()
+    
     def save(self):
         """Save all memory to disk and sync Tier 1 cache."""
         try:
-            with open(self.conv_file, "w") as f:
-                json.dump({"messages": self.conversation}, f, indent=2)
-            with open(self.facts_file, "w") as f:
-                json.dump(self.facts, f, indent=2)
-            with open(self.summaries_file, "w") as f:
-                json.dump(self.summaries, f, indent=2)
+            with self._save_lock:
+                # Clear first so changes made while writing are picked up next pass;
+                # shallow copies so other threads can keep appending while we serialize
+                self._dirty = False
+                self._write_json(self.conv_file, {"messages": list(self.conversation)})
+                self._write_json(self.facts_file, dict(self.fact_items()))
+                self._write_json(self.summaries_file, list(self.summaries))
             
                 # Sync Tier 1 cache (async, don't block) - temporarily disabled
                 # try:
@@ -86,62 +149,118 @@ class MemorySystem:
                 # except Exception as e:
                 #     logging.warning(f"Failed to sync Tier 1 cache: {e}")
         except Exception as e:
+            self._dirty = True
             logging.warning("failed to save memory: %s", e)
     
+    @staticmethod
+    def _write_json(path: Path, data) -> None:
+        """Write via a temp file and rename, so a crash mid-write never truncates memory."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        # Compact output stays on json's C encoder (indent= falls back to pure Python)
+        # and goes out in one write
+        text = json.dumps(data, separators=(",", ":"))
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
     def add_message(self, role: str, content: str):
         """Add a message to conversation history."""
         # Skip empty messages (Claude/Anthropic requires non-empty content)
         if not content or not content.strip():
             return
         
-        self.conversation.append({
+        msg = {
             "role": role,
             "content": content.strip(),
             "timestamp": datetime.now().isoformat()
-        })
+        }
+        self.conversation.append(msg)
+        self._index_message(len(self.conversation) - 1, msg)
+        if role == "user":
+            self.recent_user_messages.append(msg["content"])
+        self._dirty = True
+    
+    def _index_message(self, i: int, msg: Dict[str, str]):
+        # System messages are never search results, so they aren't indexed
+        if msg.get("role") == "system":
+            return
+        for word in _word_set(msg.get("content", "")):
+            self._word_index[word].append(i)
+    
+    def add_vision_fact(self, key: str, description: str):
+        """Archive a vision observation as a fact and index it for recall."""
+        with self._facts_lock:
+            self.facts[key] = description
+        self.vision_index.append(key)
+        self._dirty = True
+    
+    def fact_items(self) -> List[Tuple[str, str]]:
+        """Snapshot of (key, value) facts, safe to iterate while other threads update."""
+        with self._facts_lock:
+            return list(self.facts.items())
+    
+    def remove_facts(self, keys):
+        """Drop the given fact keys (missing ones are ignored)."""
+        with self._facts_lock:
+            for key in keys:
+                self.facts.pop(key, None)
+        self._dirty = True
+    
+    def recent_vision_facts(self, limit: int = 10) -> List[str]:
+        """Newest archived vision facts first (skips any removed by cleanup/pruning)."""
+        recent = []
+        for key in reversed(self.vision_index):
+            value = self.facts.get(key)
+            if value is not None:
+                recent.append(value)
+                if len(recent) == limit:
+                    break
+        return recent
     
     def extract_facts(self, llm_response: str, user_input: str):
         """
         Extract facts from conversation.
         Uses simple pattern matching + full text indexing for recall.
         """
+        self._dirty = True
         lower_input = user_input.lower()
         timestamp_key = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        # Extract name mentions
-        if "my name is" in lower_input or "i'm " in lower_input or "i am " in lower_input:
-            self.facts[f"name_mention_{timestamp_key}"] = user_input
-        
-        # Extract project mentions
-        if "project" in lower_input:
-            self.facts[f"project_{timestamp_key}"] = user_input
-        
-        # Extract preferences
-        if "i like" in lower_input or "i prefer" in lower_input or "i hate" in lower_input or "i don't like" in lower_input:
-            self.facts[f"preference_{timestamp_key}"] = user_input
-        
-        # Extract future plans
-        if "i'm going to" in lower_input or "i will" in lower_input or "planning to" in lower_input:
-            self.facts[f"plan_{timestamp_key}"] = user_input
-        
-        # Extract general mentions (things you talk about in passing)
-        # Store significant user statements that aren't just questions
-        words = user_input.split()
-        if len(words) >= 5 and not user_input.strip().endswith("?"):
-            # Check if it contains meaningful content words
-            significant_words = ["working", "building", "thinking", "tried", "found", "learned", "realized", "started", "finished"]
-            if any(word in lower_input for word in significant_words):
-                self.facts[f"mention_{timestamp_key}"] = user_input
-        
-        # Keep last 500 facts (increased from 200)
-        if len(self.facts) > 500:
-            # Remove oldest facts, but preserve user profile facts
-            profile_keys = [k for k in self.facts.keys() if k.startswith("user_")]
-            other_facts = [(k, v) for k, v in self.facts.items() if not k.startswith("user_")]
-            sorted_facts = sorted(other_facts, key=lambda x: x[0], reverse=True)
+        with self._facts_lock:
+            # Extract name mentions
+            if "my name is" in lower_input or "i'm " in lower_input or "i am " in lower_input:
+                self.facts[f"name_mention_{timestamp_key}"] = user_input
+        
+            # Extract project mentions
+            if "project" in lower_input:
+                self.facts[f"project_{timestamp_key}"] = user_input
+        
+            # Extract preferences
+            if "i like" in lower_input or "i prefer" in lower_input or "i hate" in lower_input or "i don't like" in lower_input:
+                self.facts[f"preference_{timestamp_key}"] = user_input
+        
+            # Extract future plans
+            if "i'm going to" in lower_input or "i will" in lower_input or "planning to" in lower_input:
+                self.facts[f"plan_{timestamp_key}"] = user_input
+        
+            # Extract general mentions (things you talk about in passing)
+            # Store significant user statements that aren't just questions
+            words = user_input.split()
+            if len(words) >= 5 and not user_input.strip().endswith("?"):
+                # Check if it contains meaningful content words
+                significant_words = ["working", "building", "thinking", "tried", "found", "learned", "realized", "started", "finished"]
+                if any(word in lower_input for word in significant_words):
+                    self.facts[f"mention_{timestamp_key}"] = user_input
+        
+            # Keep last 500 facts (increased from 200)
+            if len(self.facts) > 500:
+                # Remove oldest facts, but preserve user profile facts
+                profile_keys = [k for k in self.facts.keys() if k.startswith("user_")]
+                other_facts = [(k, v) for k, v in self.facts.items() if not k.startswith("user_")]
+                sorted_facts = sorted(other_facts, key=lambda x: x[0], reverse=True)
             
-            # Keep profile facts + most recent 400 other facts
-            self.facts = dict([(k, self.facts[k]) for k in profile_keys] + sorted_facts[:400])
+                # Keep profile facts + most recent 400 other facts
+                self.facts = dict([(k, self.facts[k]) for k in profile_keys] + sorted_facts[:400])
     
     def build_context_window(self, max_recent: int = 20, current_query: str = "") -> List[Dict[str, str]]:
         """
@@ -177,43 +296,41 @@ class MemorySystem:
         
         return context
     
+    def build_context_and_summary(self, current_query: str, max_recent: int = 30) -> Tuple[List[Dict[str, str]], str]:
+        """Context window and memory summary for one question (query keywords parsed once)."""
+        return (
+            self.build_context_window(max_recent=max_recent, current_query=current_query),
+            self.get_memory_summary(current_query=current_query),
+        )
+    
     def _search_relevant_messages(self, query: str, exclude_timestamps: set, max_results: int = 5) -> List[Dict[str, str]]:
         """
         Simple keyword-based semantic search through conversation history.
         Returns relevant messages from the past.
         """
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        
-        # Remove common words that don't help with relevance
-        stop_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "is", "are", "was", "were", "what", "when", "where", "who", "why", "how"}
-        query_words = query_words - stop_words
+        # Common words that don't help with relevance are dropped
+        query_words = _query_words(query)
         
         if not query_words:
             return []
         
-        # Score all messages by keyword overlap
-        scored_messages = []
-        for msg in self.conversation:
+        # Score messages by keyword overlap; the word index means only messages
+        # sharing at least one query word are looked at
+        overlap = Counter()
+        for word in query_words:
+            overlap.update(self._word_index.get(word, ()))
+        
+        # Highest score first, older message first on ties
+        results = []
+        for i in sorted(overlap, key=lambda i: (-overlap[i], i)):
+            msg = self.conversation[i]
             # Skip recent messages (already in context)
             if msg.get("timestamp", "") in exclude_timestamps:
                 continue
-            
-            # Skip system messages
-            if msg.get("role") == "system":
-                continue
-            
-            content = msg.get("content", "").lower()
-            content_words = set(content.split())
-            
-            # Calculate overlap score
-            overlap = len(query_words & content_words)
-            if overlap > 0:
-                scored_messages.append((overlap, msg))
-        
-        # Sort by score and return top results
-        scored_messages.sort(reverse=True, key=lambda x: x[0])
-        return [msg for score, msg in scored_messages[:max_results]]
+            results.append(msg)
+            if len(results) == max_results:
+                break
+        return results
     
     def get_memory_summary(self, current_query: str = "") -> str:
         """
@@ -228,7 +345,7 @@ class MemorySystem:
         
         # Add key facts (filtered for relevance if query provided)
         if self.facts:
-            relevant_facts = self._get_relevant_facts(current_query) if current_query else list(self.facts.items())[-15:]
+            relevant_facts = self._get_relevant_facts(current_query) if current_query else self.fact_items()[-15:]
             
             if relevant_facts:
                 parts.append("Key facts from memory:")
@@ -250,22 +367,17 @@ class MemorySystem:
         Find facts relevant to the current query using keyword matching.
         Returns list of (key, value) tuples.
         """
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        
-        # Remove common words
-        stop_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "is", "are", "was", "were", "what", "when", "where", "who", "why", "how"}
-        query_words = query_words - stop_words
+        query_words = _query_words(query)
         
         if not query_words:
             # No query words, return recent facts
-            return list(self.facts.items())[-max_facts:]
+            return self.fact_items()[-max_facts:]
         
         # Score facts by keyword overlap
         scored_facts = []
-        for key, value in self.facts.items():
+        for key, value in self.fact_items():
             value_lower = value.lower()
-            value_words = set(value_lower.split())
+            value_words = _word_set(value)
             overlap = len(query_words & value_words)
             
             # Boost score if query words appear in the fact
@@ -290,6 +402,7 @@ class MemorySystem:
             "timestamp": datetime.now().isoformat(),
             "message_count": len(self.conversation)
         })
+        self._dirty = True
         
         # Keep only last 20 summaries
         if len(self.summaries) > 20:
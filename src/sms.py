@@ -1,21 +1,20 @@
 from twilio.rest import Client
 import re
 
+_URL_RE = re.compile(r"https?://\S+")
+_WHITESPACE_RE = re.compile(r"\s+")
 
-def sanitize_sms(body: str, max_chars: int, allow_urls: bool, blocklist_patterns: list[str]) -> str:
+
+def sanitize_sms(body: str, max_chars: int, allow_urls: bool, blocklist: list[re.Pattern[str]]) -> str:
     text = body.strip()
     # Remove URLs unless allowed
     if not allow_urls:
-        text = re.sub(r"https?://\S+", "", text)
-    # Apply blocklist patterns
-    for pat in blocklist_patterns:
-        try:
-            text = re.sub(pat, "[redacted]", text, flags=re.IGNORECASE)
-        except re.error:
-            # skip invalid regex
-            continue
+        text = _URL_RE.sub("", text)
+    # Apply blocklist patterns (precompiled by load_config)
+    for pat in blocklist:
+        text = pat.sub("[redacted]", text)
     # Collapse whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
     # Enforce max length
     if len(text) > max_chars:
         text = text[: max_chars - 1] + "…"
@@ -12,10 +12,7 @@ Setup:
 
 from flask import Flask, request
 from twilio.twiml.messaging_response import MessagingResponse
-import json
 import logging
-from pathlib import Path
-from datetime import datetime
 
 from .config import load_config
 from .chat import chat_openrouter
@@ -90,7 +87,6 @@ def sms_reply():
     except Exception as e:
         logging.exception(f"Failed to generate response: {e}")
         # Return more detailed error for debugging
-        import traceback
         error_detail = str(e)[:100]
         reply = f"Error: {error_detail}"
     
@@ -7,7 +7,6 @@ import logging
 import time
 import requests
 from typing import Iterator
-from pathlib import Path
 
 from .sms import send_sms
 
@@ -105,12 +104,13 @@ def send_streaming_sms(
     Returns: full response text
     """
     buffer = ""
-    full_response = ""
+    # Chunks of the whole reply, joined once at the end
+    response_parts: list[str] = []
     last_send_time = time.time()
     
     for chunk in stream_llm_response(openrouter_key, model, messages, system_override, personality):
         buffer += chunk
-        full_response += chunk
+        response_parts.append(chunk)
         
         now = time.time()
         time_since_send = now - last_send_time
@@ -167,5 +167,5 @@ def send_streaming_sms(
         except Exception as e:
             logging.error(f"failed to send final SMS chunk: {e}")
     
-    return full_response
+    return "".join(response_parts)
 
@@ -6,7 +6,6 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict
 import requests
 
 
@@ -311,7 +310,7 @@ def summarize_daily_vision(
         return
     
     # Collect all vision facts from yesterday
-    vision_facts = [(k, v) for k, v in memory_system.facts.items() if k.startswith("vision_")]
+    vision_facts = [(k, v) for k, v in memory_system.fact_items() if k.startswith("vision_")]
     yesterday_vision = []
     
     for key, value in vision_facts:
@@ -355,10 +354,7 @@ def summarize_daily_vision(
     logging.info("saved vision summary for %s", date_key)
     
     # Archive individual vision facts to the summary and remove from active facts
-    for event in yesterday_vision:
-        if event["key"] in memory_system.facts:
-            del memory_system.facts[event["key"]]
-            logging.debug("archived and removed vision fact: %s", event["key"])
+    memory_system.remove_facts(event["key"] for event in yesterday_vision)
     
     memory_system.save()
     logging.info("cleaned up %d individual vision facts (replaced with daily summary)", len(yesterday_vision))
@@ -6,7 +6,7 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict
 
 
 class TieredMemory:
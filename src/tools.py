@@ -1,12 +1,31 @@
 import datetime as _dt
+import time
+from functools import lru_cache
 from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import requests
 
+# Current conditions barely move within a few minutes; repeat questions reuse them
+WEATHER_TTL_SECONDS = 600
+_weather_cache: dict[tuple[float, float], tuple[float, str]] = {}
+
+
+@lru_cache(maxsize=8)
+def _zone(timezone: str) -> ZoneInfo | None:
+    try:
+        return ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
 
 def get_local_time(timezone: Optional[str]) -> str:
     if not timezone:
         now = _dt.datetime.utcnow()
         return now.strftime("%Y-%m-%d %I:%M %p UTC")
+    # Local tz database first: no network round-trip for the time of day
+    zone = _zone(timezone)
+    if zone is not None:
+        return _dt.datetime.now(zone).strftime("%I:%M %p %Z").strip()
     try:
         resp = requests.get(f"https://worldtimeapi.org/api/timezone/{timezone}", timeout=10)
         resp.raise_for_status()
@@ -24,6 +43,10 @@ def get_local_time(timezone: Optional[str]) -> str:
 def get_weather_summary(latitude: Optional[float], longitude: Optional[float]) -> str:
     if latitude is None or longitude is None:
         return "Location not set. Provide LATITUDE and LONGITUDE in .env."
+    key = (round(latitude, 2), round(longitude, 2))
+    cached = _weather_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < WEATHER_TTL_SECONDS:
+        return cached[1]
     try:
         url = (
             "https://api.open-meteo.com/v1/forecast?latitude="
@@ -48,7 +71,9 @@ def get_weather_summary(latitude: Optional[float], longitude: Optional[float]) -
             parts.append(f"wind {wind} m/s")
         if not parts:
             return "Weather unavailable right now."
-        return ", ".join(parts)
+        summary = ", ".join(parts)
+        _weather_cache[key] = (time.monotonic(), summary)
+        return summary
     except Exception:
         return "Weather service unavailable."
 
@@ -2,7 +2,6 @@ from pathlib import Path
 import time
 import random
 import requests
-import subprocess
 import logging
 
 
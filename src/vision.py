@@ -7,6 +7,11 @@ from typing import Optional
 import numpy as np
 from PIL import Image
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the numpy kernel is used without it
+    njit = None
+
 
 @dataclass
 class MotionResult:
@@ -30,45 +35,71 @@ def capture_snapshot(width: int, height: int, out_path: Path) -> None:
     subprocess.run(cmd, check=False)
 
 
+# A pixel counts as changed if its grey level moves by more than this (out of 255)
+PIXEL_DELTA = 30
+# Motion-localisation grid (GRID x GRID cells)
+GRID = 8
+
+
+def _motion_counts_numpy(a: np.ndarray, b: np.ndarray, grid: int) -> tuple[int, int]:
+    """Changed pixels overall and grid cells with >20% changed, for two uint8 frames."""
+    h, w = a.shape
+    mask = np.abs(a.astype(np.int16) - b) > PIXEL_DELTA
+    cell_h, cell_w = h // grid, w // grid
+    cells = mask[: grid * cell_h, : grid * cell_w].reshape(grid, cell_h, grid, cell_w).sum(axis=(1, 3))
+    return int(mask.sum()), int(np.count_nonzero(cells > cell_h * cell_w * 0.2))
+
+
+def _motion_counts_loop(a: np.ndarray, b: np.ndarray, grid: int) -> tuple[int, int]:
+    # Same as the numpy version in one pass without temporaries, for numba to compile
+    h, w = a.shape
+    cell_h, cell_w = h // grid, w // grid
+    cells = np.zeros((grid, grid), dtype=np.int64)
+    changed = 0
+    for y in range(h):
+        gy = y // cell_h if cell_h > 0 else grid
+        for x in range(w):
+            d = np.int16(a[y, x]) - np.int16(b[y, x])
+            if d > PIXEL_DELTA or d < -PIXEL_DELTA:
+                changed += 1
+                gx = x // cell_w if cell_w > 0 else grid
+                if gy < grid and gx < grid:
+                    cells[gy, gx] += 1
+    active = 0
+    for gy in range(grid):
+        for gx in range(grid):
+            if cells[gy, gx] > cell_h * cell_w * 0.2:
+                active += 1
+    return changed, active
+
+
+if njit is not None:
+    _motion_counts = njit(cache=True)(_motion_counts_loop)
+    # Compile now so the first snapshot pair doesn't pay for it
+    _motion_counts(np.zeros((16, 16), dtype=np.uint8), np.zeros((16, 16), dtype=np.uint8), GRID)
+else:
+    _motion_counts = _motion_counts_numpy
+
+
 def compute_motion(prev_img: Optional[Image.Image], curr_img: Image.Image) -> float:
     if prev_img is None:
         return 0.0
-    a = np.array(prev_img.convert("L"), dtype=np.float32)
-    b = np.array(curr_img.convert("L"), dtype=np.float32)
+    # Stay in uint8; the kernels widen per pixel instead of copying to float32
+    a = np.asarray(prev_img.convert("L"))
+    b = np.asarray(curr_img.convert("L"))
     h = min(a.shape[0], b.shape[0])
     w = min(a.shape[1], b.shape[1])
-    a = a[:h, :w]
-    b = b[:h, :w]
-    
-    # Calculate absolute difference
-    diff = np.abs(a - b)
+    a = np.ascontiguousarray(a[:h, :w])
+    b = np.ascontiguousarray(b[:h, :w])
     
-    # Threshold: only count pixels that changed significantly (>30 out of 255)
-    motion_mask = diff > 30
-    
-    # Count how many pixels had significant change
-    motion_pixels = motion_mask.sum()
-    total_pixels = motion_mask.size
+    motion_pixels, active_regions = _motion_counts(a, b, GRID)
     
     # Motion score = percentage of pixels with significant change
-    motion_score = float(motion_pixels / total_pixels)
-    
-    # Additional filter: check if motion is localized (not global lighting)
-    # Divide image into grid and count active regions
-    grid_h, grid_w = 8, 8  # 8x8 grid
-    cell_h = h // grid_h
-    cell_w = w // grid_w
-    
-    active_regions = 0
-    for i in range(grid_h):
-        for j in range(grid_w):
-            cell = motion_mask[i*cell_h:(i+1)*cell_h, j*cell_w:(j+1)*cell_w]
-            # If >20% of pixels in this cell changed, count as active region
-            if cell.sum() > (cell.size * 0.2):
-                active_regions += 1
+    motion_score = motion_pixels / (h * w)
     
-    # Lighting changes affect most regions (>50%), motion is localized (<50%)
-    total_regions = grid_h * grid_w
+    # Lighting changes affect most regions (>50%), motion is localized (<50%):
+    # an active region is a grid cell with >20% of its pixels changed
+    total_regions = GRID * GRID
     if active_regions > total_regions * 0.5:
         # Likely global lighting change, heavily penalize
         return motion_score * 0.3
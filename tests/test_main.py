@@ -0,0 +1,20 @@
+import unittest
+
+from src.main import is_repetitive
+
+
+class IsRepetitiveTest(unittest.TestCase):
+    def test_short_commands_with_repeated_words_pass(self):
+        for text in ("no no stop", "sauron sauron help", "yes yes", "stop stop stop now"):
+            self.assertFalse(is_repetitive(text.split()), text)
+
+    def test_long_mishear_loop_is_flagged(self):
+        self.assertTrue(is_repetitive("thank you thank you thank you thank you".split()))
+        self.assertTrue(is_repetitive("the the the the what is it".split()))
+
+    def test_varied_transcript_passes(self):
+        self.assertFalse(is_repetitive("what is the weather like in the city today".split()))
+
+
+if __name__ == "__main__":
+    unittest.main()